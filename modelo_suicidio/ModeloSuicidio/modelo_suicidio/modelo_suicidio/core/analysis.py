@@ -1,17 +1,26 @@
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from dataclasses import replace
+from scipy.integrate import odeint
 from .parameters import ModeloParametros
 from .nonlinear_model import ModeloNoLineal
+from .data_loader import rango_anios
+
+# Memo LRU de las trayectorias simuladas: clave -> (df, t, X)
+_MAX_MEMO_SIMULACION = 4
+_memo_simulacion = OrderedDict()
 
 def condiciones_iniciales(df: pd.DataFrame, params: ModeloParametros, anio_ini: int) -> np.ndarray:
     """
     Calcula [S0, T0, R0] a partir del año anio_ini usando P, m, phi.
     """
-    row = df[df['anio'] == anio_ini]
-    if row.empty:
+    # Búsqueda posicional sobre 'anio' ordenado en lugar de filtrar el DataFrame
+    rango = rango_anios(df, anio_ini, anio_ini)
+    if rango.start == rango.stop:
         raise ValueError(f"No hay datos para el año {anio_ini}")
     
-    P0 = row['Poblacion_10ymas_P'].values[0]
+    P0 = df['Poblacion_10ymas_P'].to_numpy()[rango.start]
     
     # Opción A: Usar m * P0
     T0 = params.m * P0
@@ -24,11 +33,21 @@ def condiciones_iniciales(df: pd.DataFrame, params: ModeloParametros, anio_ini:
     
     return np.array([S0, T0, R0])
 
-def prueba_escritorio(df: pd.DataFrame, params: ModeloParametros, anio_ini: int, anio_fin: int) -> pd.DataFrame:
+def simular_anual(df: pd.DataFrame, params: ModeloParametros, anio_ini: int, anio_fin: int) -> tuple[np.ndarray, np.ndarray]:
     """
-    Corre una simulación en el rango [anio_ini, anio_fin],
-    compara T_model con T_obs y devuelve los errores por año.
+    Integra el modelo en los años enteros de [anio_ini, anio_fin] y devuelve
+    (t, X) con X de forma (len(t) x 3), columnas [S, T, R].
+    
+    Las últimas trayectorias se memorizan por (DataFrame, parámetros, años):
+    repetir la llamada con el mismo objeto df sin modificar no vuelve a
+    integrar. Los arreglos devueltos son de solo lectura.
     """
+    clave = (id(df), params, anio_ini, anio_fin)
+    memo = _memo_simulacion.get(clave)
+    if memo is not None and memo[0] is df:
+        _memo_simulacion.move_to_end(clave)
+        return memo[1], memo[2]
+    
     # Preparar modelo
     anios_data = df['anio'].values
     P_data = df['Poblacion_10ymas_P'].values
@@ -41,29 +60,82 @@ def prueba_escritorio(df: pd.DataFrame, params: ModeloParametros, anio_ini: int,
     # Usamos t_eval en los años enteros para comparar directamente
     anios_eval = np.arange(anio_ini, anio_fin + 1)
     
-    # solve_ivp directo para obtener puntos exactos
-    from scipy.integrate import solve_ivp
-    sol = solve_ivp(
-        fun=modelo.rhs,
-        t_span=(anio_ini, anio_fin),
-        y0=x0,
-        t_eval=anios_eval,
-        method='RK45'
+    t_sol, X = modelo.integrar(anios_eval, x0)
+    t_sol.setflags(write=False)
+    X.setflags(write=False)
+    
+    _memo_simulacion[clave] = (df, t_sol, X)
+    if len(_memo_simulacion) > _MAX_MEMO_SIMULACION:
+        _memo_simulacion.popitem(last=False)
+    return t_sol, X
+
+def simular_lote(
+    df: pd.DataFrame,
+    params: ModeloParametros,
+    libres: np.ndarray,
+    anio_ini: int,
+    anio_fin: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Integra en una sola llamada k variantes del modelo que solo difieren en
+    los parámetros libres: libres es una matriz (k x 4) con filas
+    [theta, rho, beta, gamma]; el resto se toma de params.
+    Devuelve (t, X) con t los años enteros de [anio_ini, anio_fin] y X de
+    forma (k x len(t) x 3), columnas [S, T, R]; las filas de un sistema
+    cuya integración no terminó quedan en NaN.
+    """
+    libres = np.asarray(libres, dtype=np.float64).reshape(-1, 4)
+    k = len(libres)
+    
+    # Los parámetros libres pasan a ser vectores de longitud k y rhs_lote
+    # evalúa los k sistemas apilados como [S_1..S_k, T_1..T_k, R_1..R_k]
+    params_lote = replace(
+        params, theta=libres[:, 0], rho=libres[:, 1], beta=libres[:, 2], gamma=libres[:, 3]
     )
+    modelo = ModeloNoLineal(params_lote, df['anio'].values, df['Poblacion_10ymas_P'].values)
     
-    # Construir DataFrame de resultados
-    res_df = pd.DataFrame({
-        'anio': sol.t,
-        'S_model': sol.y[0],
-        'T_model': sol.y[1],
-        'R_model': sol.y[2]
-    })
+    # Las condiciones iniciales no dependen de los parámetros libres
+    x0 = np.repeat(condiciones_iniciales(df, params, anio_ini), k)
+    anios_eval = np.arange(anio_ini, anio_fin + 1, dtype=np.float64)
     
-    # Merge con datos observados
-    df_obs = df[['anio', 'Poblacion_10ymas_P', 'T_obs']].copy()
-    merged = pd.merge(res_df, df_obs, on='anio', how='left')
+    Y, info = odeint(
+        modelo.rhs_lote, x0, anios_eval, tfirst=True,
+        rtol=1e-6, atol=1e-8, full_output=True
+    )
+    if info['message'] != 'Integration successful.':
+        Y[:] = np.nan
     
-    merged['error_abs'] = merged['T_model'] - merged['T_obs']
-    merged['error_rel'] = (merged['error_abs'] / merged['T_obs']).abs()
+    # (len(t) x 3k) -> (k x len(t) x 3)
+    return anios_eval, Y.reshape(len(anios_eval), 3, k).transpose(2, 0, 1)
+
+def prueba_escritorio(df: pd.DataFrame, params: ModeloParametros, anio_ini: int, anio_fin: int) -> pd.DataFrame:
+    """
+    Corre una simulación en el rango [anio_ini, anio_fin],
+    compara T_model con T_obs y devuelve los errores por año.
+    """
+    t_sol, X = simular_anual(df, params, anio_ini, anio_fin)
+    
+    # Alinear con los datos observados por posición sobre 'anio' ordenado
+    # (equivale al merge por año, con NaN en los años sin datos)
+    anios_df = df['anio'].to_numpy()
+    idx = np.minimum(np.searchsorted(anios_df, t_sol), len(anios_df) - 1)
+    hay_dato = anios_df[idx] == t_sol
+    P_obs = np.where(hay_dato, df['Poblacion_10ymas_P'].to_numpy()[idx], np.nan)
+    T_obs = np.where(hay_dato, df['T_obs'].to_numpy()[idx], np.nan)
     
-    return merged
+    T_model = X[:, 1]
+    error_abs = T_model - T_obs
+    with np.errstate(divide='ignore', invalid='ignore'):
+        error_rel = np.abs(error_abs / T_obs)
+    
+    # Construir el DataFrame de resultados en una sola llamada
+    return pd.DataFrame({
+        'anio': t_sol,
+        'S_model': X[:, 0],
+        'T_model': T_model,
+        'R_model': X[:, 2],
+        'Poblacion_10ymas_P': P_obs,
+        'T_obs': T_obs,
+        'error_abs': error_abs,
+        'error_rel': error_rel
+    })
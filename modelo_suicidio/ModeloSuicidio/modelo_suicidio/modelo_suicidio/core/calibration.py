@@ -1,106 +1,219 @@
 import numpy as np
 import pandas as pd
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from functools import partial
 from scipy.optimize import least_squares
+from scipy.stats import qmc
+from scipy.integrate import odeint
 from .parameters import ModeloParametros
 from .nonlinear_model import ModeloNoLineal
-from .analysis import condiciones_iniciales
+from .analysis import condiciones_iniciales, simular_lote
+from .data_loader import rango_anios
 
-def calibrar_parametros(
+# Límites: theta, rho, beta en [0, 1], gamma en [0, 20]
+LIMITES = (
+    [0.0, 0.0, 0.0, 0.0],
+    [1.0, 1.0, 1.0, 20.0]
+)
+
+def _ajustar_desde(
     df: pd.DataFrame,
     params_base: ModeloParametros,
     anio_ini: int,
     anio_fin: int,
-    num_theta: int = 5, # Mantenemos la firma pero usaremos la logica nueva
-    num_gamma: int = 5,
-    progress_callback = None
-) -> tuple[ModeloParametros, float, str]:
+    x0
+):
     """
-    Busca valores de theta, rho, beta y gamma que minimicen la diferencia
-    entre T_model y T_obs en [anio_ini, anio_fin].
-    
-    Usa un punto inicial robusto y límites definidos por el usuario.
+    Ejecuta least_squares desde el punto inicial x0 = [theta, rho, beta, gamma]
+    y devuelve el OptimizeResult. Es una función de módulo para poder
+    enviarse a procesos trabajadores en la calibración multi-inicio.
     """
-    
     anios_data = df['anio'].values
     P_data = df['Poblacion_10ymas_P'].values
     
     # Datos observados para comparar (años enteros)
-    mask = (df['anio'] >= anio_ini) & (df['anio'] <= anio_fin)
-    df_subset = df.loc[mask]
-    t_obs_vals = df_subset['anio'].values
-    T_obs_vals = df_subset['T_obs'].values
+    rango = rango_anios(df, anio_ini, anio_fin)
+    # Convertir una sola vez a float64 contiguo para no repetir la coerción en cada residuo
+    t_obs_vals = np.ascontiguousarray(anios_data[rango], dtype=np.float64)
+    T_obs_vals = df['T_obs'].to_numpy()[rango]
+    # odeint exige que el primer instante sea el inicial; la fila extra se descarta
+    t_integracion = np.concatenate(([float(anio_ini)], t_obs_vals))
     
-    # Punto inicial sugerido
-    # theta0 ~ delta_n (aprox 0.007), rho0=0.1, beta0=0.3, gamma0=10.0
-    x0 = [params_base.delta_n, 0.1, 0.3, 10.0]
+    bounds = LIMITES
     
-    # Límites: theta, rho, beta en [0, 1], gamma en [0, 20]
-    bounds = (
-        [0.0, 0.0, 0.0, 0.0],
-        [1.0, 1.0, 1.0, 20.0]
-    )
+    # Modelo construido una sola vez; en cada evaluación solo cambian
+    # theta, rho, beta y gamma.
+    modelo = ModeloNoLineal(params_base, anios_data, P_data)
     
-    log_str = "Iniciando calibración con parámetros iniciales:\n"
-    log_str += f"Theta: {x0[0]}, Rho: {x0[1]}, Beta: {x0[2]}, Gamma: {x0[3]}\n"
+    # Las condiciones iniciales dependen de P, m y phi, que no se calibran
+    init_cond = condiciones_iniciales(df, params_base, anio_ini)
+    
+    # Vector de penalización compartido (solo lectura) para puntos no válidos
+    penalizacion = np.full_like(T_obs_vals, 1e6, dtype=np.float64)
+    penalizacion.setflags(write=False)
+    lim_inf = np.asarray(bounds[0])
+    lim_sup = np.asarray(bounds[1])
     
     def residuals(p_vec):
-        theta, rho, beta, gamma = p_vec
+        # Descartar sin integrar los parámetros no finitos o fuera de límites
+        if not (np.all(np.isfinite(p_vec)) and np.all(p_vec >= lim_inf) and np.all(p_vec <= lim_sup)):
+            return penalizacion
         
-        # Actualizar params
-        p = ModeloParametros(
-            delta=params_base.delta,
-            delta_s=params_base.delta_s,
-            delta_n=params_base.delta_n,
-            m=params_base.m,
-            phi=params_base.phi,
-            psi=params_base.psi,
-            theta=theta,
-            rho=rho,
-            beta=beta,
-            gamma=gamma
+        modelo.update_free_params(*p_vec)
+            
+        # Simular
+        # odeint llama directamente a LSODA y evita la sobrecarga por paso
+        # de solve_ivp, que domina en un sistema de dimensión 3
+        y, info = odeint(
+            modelo.rhs,
+            init_cond,
+            t_integracion, # Evaluar exactamente en los años observados
+            Dfun=modelo.jac,
+            tfirst=True,
+            rtol=1e-6,
+            atol=1e-8,
+            full_output=True
         )
         
-        modelo = ModeloNoLineal(p, anios_data, P_data)
+        # Verificar estado
+        if info['message'] != 'Integration successful.':
+            return penalizacion
         
-        # Condiciones iniciales
-        try:
-            init_cond = condiciones_iniciales(df, p, anio_ini)
-        except Exception:
-            return np.full_like(T_obs_vals, 1e6)
+        T_model = y[1:, 1] # La segunda columna es T
             
-        # Simular
-        # Importante: simular en el rango continuo y luego interpolar, 
-        # o usar t_eval en solve_ivp. Usaremos t_eval para exactitud en los puntos.
-        try:
-            from scipy.integrate import solve_ivp
-            sol = solve_ivp(
-                fun=modelo.rhs,
-                t_span=(anio_ini, anio_fin),
-                y0=init_cond,
-                t_eval=t_obs_vals, # Evaluar exactamente en los años observados
-                method='RK45'
-            )
-            
-            if sol.status != 0 or not sol.success:
-                return np.full_like(T_obs_vals, 1e6)
-                
-            T_model = sol.y[1] # La segunda fila es T
-            
-            # Verificar longitudes
-            if len(T_model) != len(T_obs_vals):
-                return np.full_like(T_obs_vals, 1e6)
-                
-            # Retornar residuos (T_model - T_obs)
-            return T_model - T_obs_vals
-            
-        except Exception as e:
-            return np.full_like(T_obs_vals, 1e6)
+        # Retornar residuos (T_model - T_obs)
+        return T_model - T_obs_vals
+
+    # Sensibilidades iniciales nulas: las condiciones iniciales no dependen
+    # de theta, rho, beta ni gamma
+    z0 = np.concatenate((init_cond, np.zeros(12)))
+    
+    def jacobiano(p_vec):
+        # Jacobiano analítico: dT/dp en los años observados, obtenido al
+        # integrar las ecuaciones de sensibilidad junto con el modelo
+        modelo.update_free_params(*p_vec)
+        z, info = odeint(
+            modelo.rhs_sensibilidades,
+            z0,
+            t_integracion,
+            tfirst=True,
+            rtol=1e-6,
+            atol=1e-8,
+            full_output=True
+        )
+        
+        if info['message'] != 'Integration successful.':
+            # Respaldo: diferencias finitas hacia adelante
+            p_vec = np.asarray(p_vec, dtype=np.float64)
+            h = np.sqrt(np.finfo(np.float64).eps) * np.maximum(1.0, np.abs(p_vec))
+            h = np.where(p_vec + h > lim_sup, -h, h) # Perturbar hacia dentro de los límites
+            f0 = residuals(p_vec)
+            return np.column_stack([
+                (residuals(p_vec + d) - f0) / h_i for d, h_i in zip(np.diag(h), h)
+            ])
+        
+        # Columnas 7..10 del estado aumentado: dT/d[theta, rho, beta, gamma]
+        return z[1:, 7:11]
 
     # Ejecutar optimización
-    res = least_squares(residuals, x0, bounds=bounds, method='trf', verbose=0)
+    return least_squares(residuals, x0, jac=jacobiano, bounds=bounds, method='trf', x_scale='jac', verbose=0)
+
+def _mejor_punto_malla(
+    df: pd.DataFrame,
+    params_base: ModeloParametros,
+    anio_ini: int,
+    anio_fin: int,
+    x0,
+    num_theta: int,
+    num_gamma: int
+) -> tuple[np.ndarray, float]:
+    """
+    Evalúa el costo en una malla num_theta x num_gamma (theta espaciado
+    geométricamente dentro de sus límites, gamma lineal; rho y beta fijos
+    en x0) más el propio x0, integrando todos los puntos en una sola
+    llamada a simular_lote. Devuelve el punto de menor costo y su costo.
+    """
+    x0 = np.asarray(x0, dtype=np.float64)
+    thetas = np.geomspace(1e-3, LIMITES[1][0], num_theta)
+    gammas = np.linspace(LIMITES[0][3], LIMITES[1][3], num_gamma)
+    
+    malla = np.empty((num_theta * num_gamma + 1, 4))
+    malla[0] = x0
+    malla[1:, 0] = np.repeat(thetas, num_gamma)
+    malla[1:, 1] = x0[1]
+    malla[1:, 2] = x0[2]
+    malla[1:, 3] = np.tile(gammas, num_theta)
+    
+    t, X = simular_lote(df, params_base, malla, anio_ini, anio_fin)
+    
+    rango = rango_anios(df, anio_ini, anio_fin)
+    idx = np.searchsorted(t, df['anio'].to_numpy()[rango])
+    residuos = X[:, idx, 1] - df['T_obs'].to_numpy()[rango]
+    costos = 0.5 * np.einsum('ij,ij->i', residuos, residuos)
+    
+    k = int(np.nanargmin(costos)) if np.isfinite(costos).any() else 0
+    return malla[k], float(costos[k])
+
+def calibrar_parametros(
+    df: pd.DataFrame,
+    params_base: ModeloParametros,
+    anio_ini: int,
+    anio_fin: int,
+    num_theta: int = 5,
+    num_gamma: int = 5,
+    progress_callback = None,
+    n_starts: int = 1,
+    n_workers: int | None = None
+) -> tuple[ModeloParametros, float, str]:
+    """
+    Busca valores de theta, rho, beta y gamma que minimicen la diferencia
+    entre T_model y T_obs en [anio_ini, anio_fin].
+    
+    Usa un punto inicial robusto y límites definidos por el usuario; con
+    num_theta x num_gamma > 1 se parte del mejor punto de una malla
+    theta x gamma (ver _mejor_punto_malla).
+    Con n_starts > 1 agrega puntos iniciales por hipercubo latino dentro
+    de los límites, los ajusta en paralelo (n_workers procesos) y conserva
+    el de menor costo.
+    """
+    
+    # Punto inicial sugerido
+    # theta0 ~ delta_n (aprox 0.007), rho0=0.1, beta0=0.3, gamma0=10.0
+    x0 = [params_base.delta_n, 0.1, 0.3, 10.0]
+    
+    log = [
+        "Iniciando calibración con parámetros iniciales:\n",
+        f"Theta: {x0[0]}, Rho: {x0[1]}, Beta: {x0[2]}, Gamma: {x0[3]}\n"
+    ]
+    
+    if num_theta * num_gamma > 1:
+        x0, costo_malla = _mejor_punto_malla(df, params_base, anio_ini, anio_fin, x0, num_theta, num_gamma)
+        log.append(f"Mejor punto de la malla {num_theta}x{num_gamma} (costo {costo_malla:.4f}):\n")
+        log.append(f"Theta: {x0[0]}, Rho: {x0[1]}, Beta: {x0[2]}, Gamma: {x0[3]}\n")
+    if progress_callback is not None:
+        progress_callback(10)
+    
+    if n_starts <= 1:
+        res = _ajustar_desde(df, params_base, anio_ini, anio_fin, x0)
+    else:
+        # Puntos adicionales distribuidos por hipercubo latino
+        muestras = qmc.LatinHypercube(d=len(x0), seed=0).random(n_starts - 1)
+        x0_lista = [np.asarray(x0)] + list(qmc.scale(muestras, *LIMITES))
+        log.append(f"Calibración multi-inicio con {n_starts} puntos iniciales.\n")
+        
+        # 'spawn' evita bifurcar el proceso con los hilos de Qt activos
+        ajustar = partial(_ajustar_desde, df, params_base, anio_ini, anio_fin)
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn')) as ex:
+            resultados = list(ex.map(ajustar, x0_lista))
+        
+        res = min(resultados, key=lambda r: r.cost)
     
     best_params_vec = res.x
     best_cost = res.cost
+    if progress_callback is not None:
+        progress_callback(100)
     
     # Traducir mensaje de resultado
     msg_traducido = res.message
@@ -113,16 +226,12 @@ def calibrar_parametros(
     elif "The maximum number of function evaluations is exceeded" in res.message:
         msg_traducido = "Se excedió el número máximo de evaluaciones."
     
-    log_str += f"\nCalibración finalizada.\nCosto final (suma cuadrados residuos / 2): {best_cost:.4f}\n"
-    log_str += f"Éxito: {res.success}\nMensaje: {msg_traducido}\n"
+    log.append(f"\nCalibración finalizada.\nCosto final (suma cuadrados residuos / 2): {best_cost:.4f}\n")
+    log.append(f"Éxito: {res.success}\nMensaje: {msg_traducido}\n")
+    log_str = "".join(log)
     
-    final_params = ModeloParametros(
-        delta=params_base.delta,
-        delta_s=params_base.delta_s,
-        delta_n=params_base.delta_n,
-        m=params_base.m,
-        phi=params_base.phi,
-        psi=params_base.psi,
+    final_params = replace(
+        params_base,
         theta=best_params_vec[0],
         rho=best_params_vec[1],
         beta=best_params_vec[2],
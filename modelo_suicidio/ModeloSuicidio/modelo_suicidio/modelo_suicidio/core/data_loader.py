@@ -1,5 +1,21 @@
+import os
+import numpy as np
 import pandas as pd
 
+# Tipos esperados de las columnas de la hoja 'Datos'. 'anio' se lee como
+# float64 para admitir celdas vacías (notas, totales) y se convierte a
+# int32 después de descartar esas filas.
+DTYPES_DATOS = {
+    'anio': 'float64',
+    'Poblacion_10ymas_P': 'float64',
+    'defunciones_totales': 'float64',
+    'defunciones_suicidio': 'float64',
+    'T_obs': 'float64',
+}
+
+# Última lectura por archivo: {ruta absoluta: ((mtime_ns, tamaño), DataFrame)}
+_cache_datos: dict[str, tuple[tuple[int, int], pd.DataFrame]] = {}
+
 def cargar_datos_excel(ruta: str) -> pd.DataFrame:
     """
     Lee el archivo Excel (hoja 'Datos') y devuelve un DataFrame
@@ -13,9 +29,23 @@ def cargar_datos_excel(ruta: str) -> pd.DataFrame:
         delta_t  = defunciones_totales / P,
         delta_s_t = defunciones_suicidio / P,
         delta_n_t = delta_t - delta_s_t.
+    Si el archivo no cambió (misma fecha de modificación y tamaño) desde
+    la última lectura, devuelve una copia de ese resultado sin volver a
+    leer el Excel.
     """
+    clave = os.path.abspath(ruta)
+    try:
+        st = os.stat(ruta)
+        firma = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        firma = None
+    
+    en_cache = _cache_datos.get(clave)
+    if firma is not None and en_cache is not None and en_cache[0] == firma:
+        return en_cache[1].copy()
+    
     try:
-        df = pd.read_excel(ruta, sheet_name='Datos')
+        df = pd.read_excel(ruta, sheet_name='Datos', engine='calamine', dtype=DTYPES_DATOS)
     except Exception as e:
         raise ValueError(f"Error al leer el archivo Excel: {e}")
 
@@ -31,14 +61,35 @@ def cargar_datos_excel(ruta: str) -> pd.DataFrame:
         if col not in df.columns:
             raise ValueError(f"Falta la columna requerida: {col}")
 
-    # Calcular tasas si no existen
+    # Descartar filas sin año antes de pasar la columna a entero
+    df = df.dropna(subset=['anio'])
+    df['anio'] = df['anio'].astype('int32')
+
+    # Ordenar por año para poder ubicar rangos con búsqueda binaria
+    df = df.sort_values('anio').reset_index(drop=True)
+
+    # Calcular tasas si no existen (directamente sobre los arreglos de NumPy)
+    P = df['Poblacion_10ymas_P'].to_numpy()
     if 'delta_t' not in df.columns:
-        df['delta_t'] = df['defunciones_totales'] / df['Poblacion_10ymas_P']
+        df['delta_t'] = df['defunciones_totales'].to_numpy() / P
     
     if 'delta_s_t' not in df.columns:
-        df['delta_s_t'] = df['defunciones_suicidio'] / df['Poblacion_10ymas_P']
+        df['delta_s_t'] = df['defunciones_suicidio'].to_numpy() / P
         
     if 'delta_n_t' not in df.columns:
-        df['delta_n_t'] = df['delta_t'] - df['delta_s_t']
+        df['delta_n_t'] = df['delta_t'].to_numpy() - df['delta_s_t'].to_numpy()
+
+    if firma is not None:
+        _cache_datos[clave] = (firma, df.copy())
 
     return df
+
+def rango_anios(df: pd.DataFrame, anio_ini: int, anio_fin: int) -> slice:
+    """
+    Devuelve el slice posicional de las filas con anio en [anio_ini, anio_fin].
+    Supone la columna 'anio' ordenada, como la deja cargar_datos_excel.
+    """
+    anios = df['anio'].to_numpy()
+    lo = int(np.searchsorted(anios, anio_ini, side='left'))
+    hi = int(np.searchsorted(anios, anio_fin, side='right'))
+    return slice(lo, hi)
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from .data_loader import rango_anios
 
 def estimar_tasas_defuncion(df: pd.DataFrame, anio_ini: int, anio_fin: int) -> tuple[float, float, float]:
     """
@@ -7,14 +8,16 @@ def estimar_tasas_defuncion(df: pd.DataFrame, anio_ini: int, anio_fin: int) -> t
     y devuelve (delta, delta_s, delta_n) como promedios en el intervalo
     [anio_ini, anio_fin].
     """
-    mask = (df['anio'] >= anio_ini) & (df['anio'] <= anio_fin)
-    df_subset = df.loc[mask]
+    rango = rango_anios(df, anio_ini, anio_fin)
     
-    if df_subset.empty:
+    # stop <= start también cubre rangos invertidos (anio_ini > anio_fin)
+    if rango.stop <= rango.start:
         raise ValueError(f"No hay datos en el rango {anio_ini}-{anio_fin}")
 
-    delta = df_subset['delta_t'].mean()
-    delta_s = df_subset['delta_s_t'].mean()
+    # Promedios directamente sobre los arreglos de NumPy, sin Series
+    # intermedias (nanmean omite faltantes, como Series.mean)
+    delta = float(np.nanmean(df['delta_t'].to_numpy()[rango]))
+    delta_s = float(np.nanmean(df['delta_s_t'].to_numpy()[rango]))
     delta_n = delta - delta_s
     
     return delta, delta_s, delta_n
@@ -24,20 +27,23 @@ def estimar_m(df: pd.DataFrame, anio_ini: int, anio_fin: int) -> float:
     Calcula m_i = T_obs / P en el intervalo de años [anio_ini, anio_fin]
     y devuelve la media geométrica de m_i.
     """
-    mask = (df['anio'] >= anio_ini) & (df['anio'] <= anio_fin)
-    df_subset = df.loc[mask]
+    rango = rango_anios(df, anio_ini, anio_fin)
     
-    if df_subset.empty:
+    # stop <= start también cubre rangos invertidos (anio_ini > anio_fin)
+    if rango.stop <= rango.start:
         raise ValueError(f"No hay datos en el rango {anio_ini}-{anio_fin}")
 
-    m_i = df_subset['T_obs'] / df_subset['Poblacion_10ymas_P']
+    # Operar sobre los arreglos de NumPy, sin recortar el DataFrame
+    m_i = df['T_obs'].to_numpy()[rango] / df['Poblacion_10ymas_P'].to_numpy()[rango]
     # Filtrar valores <= 0 para log
     m_i_valid = m_i[m_i > 0]
     
-    if m_i_valid.empty:
+    if m_i_valid.size == 0:
         return 0.0
-        
-    m = np.exp(np.mean(np.log(m_i_valid)))
+    
+    # Logaritmo y promedio sobre el mismo temporal
+    np.log(m_i_valid, out=m_i_valid)
+    m = float(np.exp(m_i_valid.mean()))
     return m
 
 def calcular_phi_psi(m: float, phi: float = 0.5) -> tuple[float, float]:
@@ -55,8 +61,9 @@ def construir_series_lineales(df: pd.DataFrame, m: float, phi: float, psi: float
         T_lin, R_lin, S_lin,
     aplicando las relaciones lineales anteriores.
     """
-    df = df.copy()
-    df['T_lin'] = m * df['Poblacion_10ymas_P']
-    df['R_lin'] = phi * df['T_lin']
-    df['S_lin'] = df['Poblacion_10ymas_P'] - df['T_lin'] - df['R_lin']
-    return df
+    P = df['Poblacion_10ymas_P'].to_numpy()
+    T_lin = m * P
+    R_lin = phi * T_lin
+    S_lin = P - T_lin - R_lin
+    # assign devuelve un nuevo DataFrame sin copia profunda de las columnas existentes
+    return df.assign(T_lin=T_lin, R_lin=R_lin, S_lin=S_lin)
@@ -1,9 +1,71 @@
 import numpy as np
+from bisect import bisect_right
+from dataclasses import replace
 from typing import Tuple, Callable
 import pandas as pd
-from scipy.integrate import solve_ivp
+from scipy.integrate import odeint, solve_ivp
 from .parameters import ModeloParametros
 
+def _rhs_core(S, T, R, P_val, theta, rho, beta, gamma, delta_s, delta_n):
+    """
+    Núcleo aritmético del sistema no lineal, sin acceso a objetos.
+    Acepta escalares o vectores (una componente por sistema apilado)
+    y devuelve la tupla (dS/dt, dT/dt, dR/dt).
+    """
+    # Términos explícitos según solicitud
+    # Entrada a T por influencia social: beta * delta_s * (T / P) * S
+    # Entrada a T por otras causas:      gamma * (1 - beta) * delta_s * S
+    # Ambas se agrupan en un solo flujo S -> T
+    rho_T = rho * T
+    flujo_ST = delta_s * (gamma * (1 - beta) + beta * T / P_val) * S
+    
+    # Ecuaciones
+    # dS/dt = theta * P(t) + (1 - delta_n) * R - term_otras - term_influencia - delta_s * S - delta_n * S
+    dS = (theta * P_val) + ((1 - delta_n) * R) - flujo_ST - (delta_s + delta_n) * S
+    
+    # dT/dt = term_otras + term_influencia - rho * T - delta_s * T - delta_n * T
+    dT = flujo_ST - rho_T - (delta_s + delta_n) * T
+    
+    # dR/dt = rho * T - R
+    dR = rho_T - R
+    
+    return dS, dT, dR
+
+def _sensibilidades_core(S, T, sens, P_val, rho, beta, gamma, delta_s, delta_n):
+    """
+    Núcleo escalar de las ecuaciones de sensibilidad: devuelve la lista de
+    12 derivadas de dy/dp (matriz 3x4 aplanada por filas) a partir de la
+    lista sens con el mismo orden. Desarrolla J·(dy/dp) + df/dp término a
+    término para no construir matrices de NumPy en cada paso.
+    """
+    # Elementos no nulos del Jacobiano (ver ModeloNoLineal.jac)
+    c_otras = gamma * (1 - beta) * delta_s
+    c_influencia = beta * delta_s / P_val
+    j11 = -c_otras - c_influencia * T - delta_s - delta_n
+    j12 = -c_influencia * S
+    j13 = 1 - delta_n
+    j21 = c_otras + c_influencia * T
+    j22 = c_influencia * S - rho - delta_s - delta_n
+
+    # Derivadas parciales de [dS/dt, dT/dt, dR/dt] respecto a [theta, rho, beta, gamma]
+    d_beta = delta_s * S * (gamma - T / P_val)
+    d_gamma = (1 - beta) * delta_s * S
+
+    s0, s1, s2 = sens[0:4], sens[4:8], sens[8:12]
+    fila_S = [j11 * a + j12 * b + j13 * c for a, b, c in zip(s0, s1, s2)]
+    fila_T = [j21 * a + j22 * b for a, b in zip(s0, s1)]
+    fila_R = [rho * b - c for b, c in zip(s1, s2)]
+
+    fila_S[0] += P_val
+    fila_S[2] += d_beta
+    fila_S[3] -= d_gamma
+    fila_T[1] -= T
+    fila_T[2] -= d_beta
+    fila_T[3] += d_gamma
+    fila_R[1] += T
+
+    return fila_S + fila_T + fila_R
+
 class ModeloNoLineal:
     def __init__(self, params: ModeloParametros, anios: np.ndarray, P: np.ndarray):
         """
@@ -12,14 +74,44 @@ class ModeloNoLineal:
         Prepara un interpolador lineal P_t(t) sobre ese rango.
         """
         self.params = params
-        self.anios = anios.astype(float)
-        self.P = P.astype(float)
+        # Sin copia cuando ya llegan como float64 contiguo (el caso de P)
+        self.anios = np.ascontiguousarray(anios, dtype=np.float64)
+        self.P = np.ascontiguousarray(P, dtype=np.float64)
+        
+        # Coeficientes del interpolador calculados una sola vez, como listas
+        # de floats para evaluar P_t con aritmética escalar en el integrador
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pendientes = np.diff(self.P) / np.diff(self.anios)
+        self._nodos = self.anios.tolist()
+        self._valores = self.P.tolist()
+        self._pendientes = pendientes.tolist()
+        # Último tramo usado por P_t; -1 no coincide con ningún intervalo
+        self._tramo = -1
         
     def P_t(self, t: float) -> float:
         """
-        Devuelve P(t) interpolando linealmente entre los valores anuales.
+        Devuelve P(t) interpolando linealmente entre los valores anuales
+        (constante fuera del rango, igual que np.interp).
         """
-        return np.interp(t, self.anios, self.P)
+        nodos = self._nodos
+        i = self._tramo
+        # El integrador avanza casi siempre dentro del mismo tramo: probarlo
+        # antes de repetir la búsqueda binaria
+        if not (nodos[i] <= t < nodos[i + 1]):
+            i = bisect_right(nodos, t) - 1
+            if i < 0:
+                return self._valores[0]
+            if i >= len(self._pendientes):
+                return self._valores[-1]
+            self._tramo = i
+        return self._valores[i] + self._pendientes[i] * (t - nodos[i])
+
+    def update_free_params(self, theta, rho, beta, gamma) -> None:
+        """
+        Sustituye los parámetros libres de la calibración (theta, rho,
+        beta, gamma) sin reconstruir el interpolador de P(t).
+        """
+        self.params = replace(self.params, theta=theta, rho=rho, beta=beta, gamma=gamma)
 
     def rhs(self, t: float, y: np.ndarray) -> np.ndarray:
         """
@@ -27,60 +119,117 @@ class ModeloNoLineal:
         y = [S, T, R]
         Devuelve [dS/dt, dT/dt, dR/dt].
         """
+        # tolist() entrega floats de Python: la aritmética escalar es más
+        # rápida que operar con escalares de NumPy en cada paso del integrador
+        S, T, R = y.tolist()
+        p = self.params
+        return np.array(_rhs_core(
+            S, T, R, self._P_seguro(t),
+            p.theta, p.rho, p.beta, p.gamma, p.delta_s, p.delta_n
+        ))
+
+    def rhs_lote(self, t: float, y: np.ndarray) -> np.ndarray:
+        """
+        Versión apilada de rhs para integrar k sistemas en una sola llamada:
+        y = [S_1..S_k, T_1..T_k, R_1..R_k] y los parámetros pueden ser
+        vectores de longitud k (uno por sistema).
+        """
+        S, T, R = y.reshape(3, -1)
+        p = self.params
+        return np.concatenate(_rhs_core(
+            S, T, R, self._P_seguro(t),
+            p.theta, p.rho, p.beta, p.gamma, p.delta_s, p.delta_n
+        ))
+
+    def _P_seguro(self, t: float) -> float:
+        """
+        P(t) protegido contra valores nulos para evitar división por cero.
+        """
+        P_val = self.P_t(t)
+        if P_val < 1e-9:
+            P_val = 1.0
+        return P_val
+
+    def jac(self, t: float, y: np.ndarray) -> np.ndarray:
+        """
+        Jacobiano analítico del sistema (matriz 3x3 de derivadas parciales
+        de [dS/dt, dT/dt, dR/dt] respecto a [S, T, R]).
+        """
         S, T, R = y
-        
-        # Parámetros
+
         delta_n = self.params.delta_n
         delta_s = self.params.delta_s
-        theta = self.params.theta
         rho = self.params.rho
         beta = self.params.beta
         gamma = self.params.gamma
-        
-        P_val = self.P_t(t)
-        
-        # Evitar división por cero
-        if P_val < 1e-9:
-            P_val = 1.0
 
-        # Términos explícitos según solicitud
-        # Entrada a T por influencia social
-        term_influencia = beta * delta_s * (T / P_val) * S
-        
-        # Entrada a T por otras causas
-        term_otras = gamma * (1 - beta) * delta_s * S
-        
-        # Ecuaciones
-        # dS/dt = theta * P(t) + (1 - delta_n) * R - term_otras - term_influencia - delta_s * S - delta_n * S
-        dS = (theta * P_val) + ((1 - delta_n) * R) - term_otras - term_influencia - (delta_s * S) - (delta_n * S)
-        
-        # dT/dt = term_otras + term_influencia - rho * T - delta_s * T - delta_n * T
-        dT = term_otras + term_influencia - (rho * T) - (delta_s * T) - (delta_n * T)
-        
-        # dR/dt = rho * T - R
-        dR = (rho * T) - R
-        
-        return np.array([dS, dT, dR])
+        P_val = self._P_seguro(t)
 
-    def simular(self, t0: float, tf: float, x0: np.ndarray, num_puntos: int = 500) -> Tuple[np.ndarray, np.ndarray]:
+        # Derivadas de los términos de entrada a T
+        c_otras = gamma * (1 - beta) * delta_s
+        c_influencia = beta * delta_s / P_val
+
+        return np.array([
+            [-c_otras - c_influencia * T - delta_s - delta_n, -c_influencia * S, 1 - delta_n],
+            [c_otras + c_influencia * T, c_influencia * S - rho - delta_s - delta_n, 0.0],
+            [0.0, rho, -1.0]
+        ])
+
+    def rhs_sensibilidades(self, t: float, z: np.ndarray) -> np.ndarray:
         """
-        Integra el sistema desde t0 hasta tf usando solve_ivp.
-        x0 = [S0, T0, R0].
-        Devuelve:
-            t: vector de tiempos,
-            X: matriz (num_puntos x 3) con columnas [S, T, R].
+        Sistema aumentado con las ecuaciones de sensibilidad respecto a los
+        parámetros libres p = [theta, rho, beta, gamma]:
+        z = [S, T, R, dy/dp (matriz 3x4 aplanada por filas)].
+        Las sensibilidades cumplen d(dy/dp)/dt = J·(dy/dp) + df/dp.
         """
-        t_eval = np.linspace(t0, tf, num_puntos)
+        S, T, R, *sens = z.tolist()
+        p = self.params
+        P_val = self._P_seguro(t)
+
+        dy = _rhs_core(S, T, R, P_val, p.theta, p.rho, p.beta, p.gamma, p.delta_s, p.delta_n)
+        d_sens = _sensibilidades_core(S, T, sens, P_val, p.rho, p.beta, p.gamma, p.delta_s, p.delta_n)
+        return np.array([*dy, *d_sens])
+
+    def integrar(self, t_eval: np.ndarray, x0: np.ndarray, usar_solve_ivp: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Integra el sistema desde t_eval[0] con x0 = [S0, T0, R0] y devuelve
+        (t, X) en los instantes de t_eval, con X de forma (len(t) x 3).
+        Usa LSODA mediante odeint, cuyo bucle de pasos no vuelve a Python;
+        si odeint falla (o con usar_solve_ivp=True) recurre a solve_ivp con
+        RK45, que devuelve solo los puntos alcanzados.
+        """
+        t_eval = np.asarray(t_eval, dtype=np.float64)
+        if t_eval.size == 1:
+            # Sin intervalo que integrar: solo el estado inicial
+            return t_eval, np.asarray(x0, dtype=np.float64).reshape(1, 3)
+        
+        if not usar_solve_ivp:
+            X, info = odeint(
+                self.rhs, x0, t_eval, Dfun=self.jac, tfirst=True,
+                rtol=1e-6, atol=1e-8, full_output=True
+            )
+            if info['message'] == 'Integration successful.':
+                return t_eval, X
         
         sol = solve_ivp(
             fun=self.rhs,
-            t_span=(t0, tf),
+            t_span=(t_eval[0], t_eval[-1]),
             y0=x0,
             t_eval=t_eval,
-            method='RK45' # O LSODA si es rígido, pero RK45 suele ir bien
+            method='RK45'
         )
         
         if not sol.success:
             print(f"Advertencia en simulación: {sol.message}")
             
         return sol.t, sol.y.T
+
+    def simular(self, t0: float, tf: float, x0: np.ndarray, num_puntos: int = 500) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Integra el sistema desde t0 hasta tf (ver integrar).
+        x0 = [S0, T0, R0].
+        Devuelve:
+            t: vector de tiempos,
+            X: matriz (num_puntos x 3) con columnas [S, T, R].
+        """
+        return self.integrar(np.linspace(t0, tf, num_puntos), x0)
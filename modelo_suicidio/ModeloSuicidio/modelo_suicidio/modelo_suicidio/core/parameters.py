@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModeloParametros:
     delta: float      # δ: tasa media de defunción total
     delta_s: float    # δ_s: tasa media de defunción por suicidio
@@ -1,47 +1,80 @@
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from typing import Iterator
 from .parameters import ModeloParametros
 from .analysis import prueba_escritorio
 
+# Memo LRU de calculate_statistics: clave -> (df, stats)
+_MAX_MEMO_ESTADISTICAS = 4
+_memo_estadisticas = OrderedDict()
+
 def calculate_statistics(df: pd.DataFrame, params: ModeloParametros, anio_ini: int, anio_fin: int) -> dict:
     """
     Calcula estadísticos de ajuste (R2, MSE, RMSE, MAE, MAPE) comparando T_model vs T_obs.
     Retorna un diccionario con las métricas y el DataFrame de resultados simulados.
+    
+    Los últimos resultados se memorizan por (DataFrame, parámetros, años):
+    repetir la llamada con el mismo objeto df sin modificar no vuelve a simular.
     """
+    clave = (id(df), params, anio_ini, anio_fin)
+    memo = _memo_estadisticas.get(clave)
+    if memo is not None and memo[0] is df:
+        _memo_estadisticas.move_to_end(clave)
+        return memo[1]
+    
     # Ejecutar simulación para obtener datos comparados
     res_df = prueba_escritorio(df, params, anio_ini, anio_fin)
+    stats = calcular_estadisticas(res_df)
     
-    # Filtrar filas válidas (donde hay T_obs)
-    valid = res_df.dropna(subset=['T_obs', 'T_model'])
+    _memo_estadisticas[clave] = (df, stats)
+    if len(_memo_estadisticas) > _MAX_MEMO_ESTADISTICAS:
+        _memo_estadisticas.popitem(last=False)
+    return stats
+
+def calcular_estadisticas(res_df: pd.DataFrame) -> dict:
+    """
+    Calcula los estadísticos de ajuste a partir de un resultado ya simulado
+    (la salida de prueba_escritorio), sin volver a integrar el modelo.
+    """
+    # Extraer ambas columnas en una sola conversión y filtrar las filas
+    # válidas (donde hay T_obs y T_model) sobre el arreglo, sin dropna
+    datos = res_df[['T_obs', 'T_model']].to_numpy(dtype=np.float64)
+    datos = datos[~np.isnan(datos).any(axis=1)]
     
-    if valid.empty:
+    if len(datos) == 0:
         return {
             'R2': 0.0, 'MSE': 0.0, 'RMSE': 0.0, 'MAE': 0.0, 'MAPE': 0.0,
             'n_obs': 0, 'res_df': res_df
         }
     
-    y_true = valid['T_obs'].values
-    y_pred = valid['T_model'].values
+    y_true = datos[:, 0]
+    y_pred = datos[:, 1]
+    
+    # Residuos calculados una sola vez y reutilizados por todas las métricas
+    err = y_true - y_pred
+    abs_err = np.abs(err)
+    sq = err * err
     
     # R2
-    ss_res = np.sum((y_true - y_pred) ** 2)
-    ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
+    ss_res = sq.sum()
+    ss_tot = ((y_true - y_true.mean()) ** 2).sum()
     r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0.0
     
     # MSE
-    mse = np.mean((y_true - y_pred) ** 2)
+    mse = sq.mean()
     
     # RMSE
     rmse = np.sqrt(mse)
     
     # MAE
-    mae = np.mean(np.abs(y_true - y_pred))
+    mae = abs_err.mean()
     
     # MAPE
     # Evitar división por cero
     mask_nonzero = y_true != 0
-    if np.any(mask_nonzero):
-        mape = np.mean(np.abs((y_true[mask_nonzero] - y_pred[mask_nonzero]) / y_true[mask_nonzero])) * 100
+    if mask_nonzero.any():
+        mape = (abs_err[mask_nonzero] / np.abs(y_true[mask_nonzero])).mean() * 100
     else:
         mape = 0.0
         
@@ -62,12 +95,26 @@ def generar_texto_conclusion_detallada(
     anio_ini: int,
     anio_fin: int
 ) -> str:
+    """
+    Construye el texto de conclusiones completo
+    (ver generar_texto_conclusion_detallada_iter).
+    """
+    return "".join(generar_texto_conclusion_detallada_iter(stats, params, df_resultados, anio_ini, anio_fin))
+
+def generar_texto_conclusion_detallada_iter(
+    stats: dict,
+    params: ModeloParametros,
+    df_resultados: pd.DataFrame,
+    anio_ini: int,
+    anio_fin: int
+) -> Iterator[str]:
     """
     Construye el texto de conclusiones siguiendo la estructura descrita:
     resumen general, comparación datos vs modelo, interpretación de métricas,
     interpretación de parámetros y conclusión general.
     Usa lenguaje claro en español y condicionales basados en R² y MAPE
     para clasificar la calidad del ajuste.
+    Entrega el texto por partes para poder escribirlo sin materializarlo completo.
     """
     r2 = stats.get('R2', 0)
     mape = stats.get('MAPE', 0)
@@ -75,27 +122,31 @@ def generar_texto_conclusion_detallada(
     mae = stats.get('MAE', 0)
     
     # Filtrar datos válidos para análisis detallado
-    valid = df_resultados.dropna(subset=['T_obs', 'T_model']).copy()
+    valid = df_resultados.dropna(subset=['T_obs', 'T_model'])
     if valid.empty:
-        return "No hay suficientes datos observados para generar conclusiones detalladas."
+        yield "No hay suficientes datos observados para generar conclusiones detalladas."
+        return
         
-    t_obs_mean = valid['T_obs'].mean()
-    t_model_mean = valid['T_model'].mean()
+    anios = valid['anio'].to_numpy()
+    t_obs = valid['T_obs'].to_numpy()
+    t_model = valid['T_model'].to_numpy()
+    t_obs_mean = t_obs.mean()
+    t_model_mean = t_model.mean()
     diff_mean = t_model_mean - t_obs_mean
     
-    # Calcular errores por año
-    valid['error'] = valid['T_model'] - valid['T_obs']
-    valid['error_rel'] = (valid['error'] / valid['T_obs']).abs() * 100
+    # Calcular errores por año (sobre arreglos, con un único índice posicional)
+    err_abs = t_model - t_obs
+    err_rel = np.abs(err_abs / t_obs) * 100
     
-    idx_max_error = valid['error_rel'].idxmax()
-    anio_max_error = valid.loc[idx_max_error, 'anio']
-    max_error_rel = valid.loc[idx_max_error, 'error_rel']
-    error_max_abs = valid.loc[idx_max_error, 'error']
+    i_max = int(np.nanargmax(err_rel))
+    anio_max_error = anios[i_max]
+    max_error_rel = err_rel[i_max]
+    error_max_abs = err_abs[i_max]
     
-    txt = "=== INFORME DE CONCLUSIONES DEL MODELO ===\n\n"
+    yield "=== INFORME DE CONCLUSIONES DEL MODELO ===\n\n"
     
     # 1. RESUMEN GENERAL
-    txt += "1. RESUMEN GENERAL\n"
+    yield "1. RESUMEN GENERAL\n"
     calidad = ""
     if r2 >= 0.9 and mape < 10:
         calidad = "Muy bueno"
@@ -107,70 +158,69 @@ def generar_texto_conclusion_detallada(
         calidad = "Débil"
         desc = "El modelo tiene dificultades para capturar la variabilidad de los datos observados, presentando desviaciones importantes."
         
-    txt += f"El ajuste del modelo se considera: {calidad}.\n"
-    txt += f"{desc}\n\n"
+    yield f"El ajuste del modelo se considera: {calidad}.\n"
+    yield f"{desc}\n\n"
     
     # 2. COMPARACIÓN DATOS OBSERVADOS VS SIMULADOS
-    txt += "2. COMPARACIÓN ENTRE DATOS OBSERVADOS Y SIMULADOS\n"
-    txt += f"En el periodo analizado ({anio_ini}-{anio_fin}):\n"
-    txt += f"- Promedio de casos observados: {t_obs_mean:.1f}\n"
-    txt += f"- Promedio de casos simulados: {t_model_mean:.1f}\n"
+    yield "2. COMPARACIÓN ENTRE DATOS OBSERVADOS Y SIMULADOS\n"
+    yield f"En el periodo analizado ({anio_ini}-{anio_fin}):\n"
+    yield f"- Promedio de casos observados: {t_obs_mean:.1f}\n"
+    yield f"- Promedio de casos simulados: {t_model_mean:.1f}\n"
     
     if diff_mean > 0:
-        txt += f"En promedio, el modelo sobreestima los casos en tratamiento en alrededor de {abs(diff_mean):.0f} personas por año.\n"
+        yield f"En promedio, el modelo sobreestima los casos en tratamiento en alrededor de {abs(diff_mean):.0f} personas por año.\n"
     else:
-        txt += f"En promedio, el modelo subestima los casos en tratamiento en alrededor de {abs(diff_mean):.0f} personas por año.\n"
+        yield f"En promedio, el modelo subestima los casos en tratamiento en alrededor de {abs(diff_mean):.0f} personas por año.\n"
         
-    txt += f"El mayor error relativo se observa en {int(anio_max_error)}, donde el modelo "
+    yield f"El mayor error relativo se observa en {int(anio_max_error)}, donde el modelo "
     if error_max_abs > 0:
-        txt += f"sobreestima en aproximadamente {error_max_abs:.0f} casos ({max_error_rel:.1f}%).\n\n"
+        yield f"sobreestima en aproximadamente {error_max_abs:.0f} casos ({max_error_rel:.1f}%).\n\n"
     else:
-        txt += f"subestima en aproximadamente {abs(error_max_abs):.0f} casos ({max_error_rel:.1f}%).\n\n"
+        yield f"subestima en aproximadamente {abs(error_max_abs):.0f} casos ({max_error_rel:.1f}%).\n\n"
 
     # 3. INTERPRETACIÓN DE LAS MÉTRICAS
-    txt += "3. INTERPRETACIÓN DE LAS MÉTRICAS\n"
-    txt += f"- R² ({r2:.4f}): Indica que el modelo explica el {r2*100:.1f}% de la variabilidad de los datos observados.\n"
-    txt += f"- RMSE ({rmse:.1f}) / MAE ({mae:.1f}): En promedio, las predicciones del modelo se alejan {mae:.1f} casos de los valores reales.\n"
-    txt += f"- MAPE ({mape:.2f}%): Significa que, en promedio, las predicciones del modelo se desvían un {mape:.2f}% de los datos observados.\n\n"
+    yield "3. INTERPRETACIÓN DE LAS MÉTRICAS\n"
+    yield f"- R² ({r2:.4f}): Indica que el modelo explica el {r2*100:.1f}% de la variabilidad de los datos observados.\n"
+    yield f"- RMSE ({rmse:.1f}) / MAE ({mae:.1f}): En promedio, las predicciones del modelo se alejan {mae:.1f} casos de los valores reales.\n"
+    yield f"- MAPE ({mape:.2f}%): Significa que, en promedio, las predicciones del modelo se desvían un {mape:.2f}% de los datos observados.\n\n"
     
     # 4. PARÁMETROS DEL MODELO
-    txt += "4. PARÁMETROS DEL MODELO\n"
-    txt += f"- Beta (β = {params.beta:.6f}): Intensidad del 'contagio' o influencia social.\n"
+    yield "4. PARÁMETROS DEL MODELO\n"
+    yield f"- Beta (β = {params.beta:.6f}): Intensidad del 'contagio' o influencia social.\n"
     if params.beta > 0.1:
-        txt += "  Un valor alto sugiere que la influencia social juega un papel crucial en la propagación.\n"
+        yield "  Un valor alto sugiere que la influencia social juega un papel crucial en la propagación.\n"
     else:
-        txt += "  Un valor bajo sugiere que la influencia social tiene un efecto moderado o limitado.\n"
+        yield "  Un valor bajo sugiere que la influencia social tiene un efecto moderado o limitado.\n"
         
-    txt += f"- Gamma (γ = {params.gamma:.6f}): Fuerza de factores externos que llevan a tratamiento.\n"
-    txt += "  Representa la entrada a tratamiento por causas ajenas al contagio social (factores económicos, personales, etc.).\n"
+    yield f"- Gamma (γ = {params.gamma:.6f}): Fuerza de factores externos que llevan a tratamiento.\n"
+    yield "  Representa la entrada a tratamiento por causas ajenas al contagio social (factores económicos, personales, etc.).\n"
     
-    txt += f"- Rho (ρ = {params.rho:.6f}): Velocidad de salida de tratamiento (recuperación).\n"
+    yield f"- Rho (ρ = {params.rho:.6f}): Velocidad de salida de tratamiento (recuperación).\n"
     if params.rho > 0:
         tiempo_recup = 1/params.rho
-        txt += f"  Este valor sugiere un tiempo promedio de permanencia en tratamiento de aproximadamente {tiempo_recup:.2f} años.\n"
+        yield f"  Este valor sugiere un tiempo promedio de permanencia en tratamiento de aproximadamente {tiempo_recup:.2f} años.\n"
     else:
-        txt += "  El valor es 0, lo que implica que no hay salida de tratamiento en el modelo.\n"
+        yield "  El valor es 0, lo que implica que no hay salida de tratamiento en el modelo.\n"
         
-    txt += f"- Theta (θ = {params.theta:.6f}): Entrada desde población vulnerable a susceptibles.\n\n"
+    yield f"- Theta (θ = {params.theta:.6f}): Entrada desde población vulnerable a susceptibles.\n\n"
     
     # 5. COMENTARIO SOBRE LA TABLA COMPARATIVA
-    txt += "5. COMENTARIO SOBRE LA TABLA COMPARATIVA\n"
-    txt += generar_conclusion_tabla_comparativa(df_resultados) + "\n\n"
+    yield "5. COMENTARIO SOBRE LA TABLA COMPARATIVA\n"
+    # Reutiliza los arreglos ya extraídos en lugar de volver a recorrer el DataFrame
+    yield _texto_tabla_comparativa(anios, *_errores_tabla(valid, err_abs, err_rel)) + "\n\n"
 
     # 6. CONCLUSIÓN GENERAL
-    txt += "6. CONCLUSIÓN GENERAL\n"
+    yield "6. CONCLUSIÓN GENERAL\n"
     if calidad == "Muy bueno":
-        txt += "El modelo es muy útil para describir la dinámica de T(t) en Oaxaca y puede usarse con confianza para proyecciones a corto plazo."
+        yield "El modelo es muy útil para describir la dinámica de T(t) en Oaxaca y puede usarse con confianza para proyecciones a corto plazo."
     elif calidad == "Bueno/Aceptable":
-        txt += "El modelo es útil para entender la tendencia general, pero se debe tener precaución con las predicciones exactas en años específicos."
-        txt += " Se recomienda revisar si hay eventos externos en los años de mayor error que no están siendo capturados."
+        yield "El modelo es útil para entender la tendencia general, pero se debe tener precaución con las predicciones exactas en años específicos."
+        yield " Se recomienda revisar si hay eventos externos en los años de mayor error que no están siendo capturados."
     else:
-        txt += "El modelo actual no captura adecuadamente la dinámica observada. Se recomienda:\n"
-        txt += " - Revisar la calidad de los datos observados.\n"
-        txt += " - Intentar calibrar con un rango de años diferente.\n"
-        txt += " - Considerar si los supuestos del modelo (ej. parámetros constantes) son válidos para todo el periodo."
-        
-    return txt
+        yield "El modelo actual no captura adecuadamente la dinámica observada. Se recomienda:\n"
+        yield " - Revisar la calidad de los datos observados.\n"
+        yield " - Intentar calibrar con un rango de años diferente.\n"
+        yield " - Considerar si los supuestos del modelo (ej. parámetros constantes) son válidos para todo el periodo."
 
 def generar_conclusion_tabla_comparativa(df_resultados: pd.DataFrame) -> str:
     """
@@ -180,48 +230,66 @@ def generar_conclusion_tabla_comparativa(df_resultados: pd.DataFrame) -> str:
       - Indique el año con mayor error relativo y el valor aproximado del error.
       - Comente si los errores tienden a ser mayores al inicio, en la mitad o al final del periodo.
     """
-    valid = df_resultados.dropna(subset=['T_obs', 'T_model']).copy()
+    valid = df_resultados.dropna(subset=['T_obs', 'T_model'])
     if valid.empty:
         return "No hay datos suficientes para analizar la tabla comparativa."
 
-    # Asegurar columnas de error
-    if 'error' not in valid.columns:
-        valid['error'] = valid['T_model'] - valid['T_obs']
-    if 'error_rel' not in valid.columns:
-        valid['error_rel'] = (valid['error'] / valid['T_obs']).abs() * 100
+    # Trabajar sobre los arreglos de NumPy, sin copiar ni agregar columnas
+    t_obs = valid['T_obs'].to_numpy()
+    t_mod = valid['T_model'].to_numpy()
+    err = t_mod - t_obs
+    err, err_rel = _errores_tabla(valid, err, np.abs(err / t_obs) * 100)
+    return _texto_tabla_comparativa(valid['anio'].to_numpy(), err, err_rel)
 
+def _errores_tabla(valid: pd.DataFrame, err: np.ndarray, err_rel: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Da preferencia a las columnas 'error' y 'error_rel' de la tabla
+    comparativa cuando existen; si no, usa los arreglos recibidos.
+    """
+    if 'error' in valid.columns:
+        err = valid['error'].to_numpy()
+    if 'error_rel' in valid.columns:
+        err_rel = valid['error_rel'].to_numpy()
+    return err, err_rel
+
+def _texto_tabla_comparativa(anios: np.ndarray, err: np.ndarray, err_rel: np.ndarray) -> str:
+    """
+    Texto de generar_conclusion_tabla_comparativa a partir de los arreglos
+    de años, error (T_model - T_obs) y error relativo, sin filas vacías.
+    """
     # 1. Sobre/Subestimación promedio
-    mean_error = valid['error'].mean()
+    mean_error = err.mean()
     if mean_error > 0:
         tendencia = "tiende a sobreestimar ligeramente"
     else:
         tendencia = "tiende a subestimar ligeramente"
     
-    txt = f"Al observar la tabla comparativa, se nota que el modelo {tendencia} los valores observados (error medio de {mean_error:.1f} casos). "
+    # Fragmentos del texto, unidos al final con una sola copia
+    partes = [f"Al observar la tabla comparativa, se nota que el modelo {tendencia} los valores observados (error medio de {mean_error:.1f} casos). "]
 
     # 2. Año con mayor error
-    idx_max = valid['error_rel'].idxmax()
-    anio_max = valid.loc[idx_max, 'anio']
-    err_max = valid.loc[idx_max, 'error_rel']
-    txt += f"La mayor discrepancia relativa ocurre en el año {int(anio_max)} con un error del {err_max:.1f}%. "
+    i_max = int(np.nanargmax(err_rel))
+    anio_max = anios[i_max]
+    err_max = err_rel[i_max]
+    partes.append(f"La mayor discrepancia relativa ocurre en el año {int(anio_max)} con un error del {err_max:.1f}%. ")
 
     # 3. Distribución temporal del error (Inicio vs Final)
     # Dividir en dos mitades
-    mid_idx = len(valid) // 2
-    first_half = valid.iloc[:mid_idx]
-    second_half = valid.iloc[mid_idx:]
+    mid_idx = err_rel.size // 2
+    first_half = err_rel[:mid_idx]
+    second_half = err_rel[mid_idx:]
 
-    mean_err_rel_1 = first_half['error_rel'].mean() if not first_half.empty else 0
-    mean_err_rel_2 = second_half['error_rel'].mean() if not second_half.empty else 0
+    mean_err_rel_1 = np.nanmean(first_half) if first_half.size else 0
+    mean_err_rel_2 = np.nanmean(second_half) if second_half.size else 0
 
     if abs(mean_err_rel_1 - mean_err_rel_2) < 2.0:
-        txt += "Los errores se mantienen relativamente constantes a lo largo del periodo."
+        partes.append("Los errores se mantienen relativamente constantes a lo largo del periodo.")
     elif mean_err_rel_1 > mean_err_rel_2:
-        txt += "Los errores tienden a ser mayores al inicio del periodo, mejorando el ajuste en los años más recientes."
+        partes.append("Los errores tienden a ser mayores al inicio del periodo, mejorando el ajuste en los años más recientes.")
     else:
-        txt += "El ajuste es mejor al inicio, pero los errores aumentan en los años finales del periodo."
+        partes.append("El ajuste es mejor al inicio, pero los errores aumentan en los años finales del periodo.")
 
-    return txt
+    return "".join(partes)
 
 # Mantener compatibilidad hacia atrás si es necesario, o eliminar si ya no se usa
 def generate_conclusion_text(stats: dict, params: ModeloParametros) -> str:
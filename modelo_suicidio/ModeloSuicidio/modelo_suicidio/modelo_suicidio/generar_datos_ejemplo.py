@@ -8,14 +8,19 @@ n = len(anios)
 # P(t) creciente
 P = np.linspace(3000000, 3500000, n)
 
+# Ruido gaussiano de las tres series en una sola extracción reproducible
+# (desviaciones: 100 defunciones totales, 10 suicidios, 500 en tratamiento)
+rng = np.random.default_rng(42)
+ruido = rng.standard_normal((n, 3)) * np.array([100, 10, 500])
+
 # Defunciones totales (aprox 0.6% de P)
-def_tot = P * 0.006 + np.random.normal(0, 100, n)
+def_tot = P * 0.006 + ruido[:, 0]
 
 # Defunciones suicidio (aprox 0.01% de P)
-def_sui = P * 0.0001 + np.random.normal(0, 10, n)
+def_sui = P * 0.0001 + ruido[:, 1]
 
 # T_obs (población en tratamiento, aprox 0.5% de P)
-T_obs = P * 0.005 + np.random.normal(0, 500, n)
+T_obs = P * 0.005 + ruido[:, 2]
 
 df = pd.DataFrame({
     'anio': anios,
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos se importan como paquetes de nivel superior (core, ui)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
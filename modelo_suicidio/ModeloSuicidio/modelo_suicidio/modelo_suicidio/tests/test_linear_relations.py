@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.linear_relations import estimar_tasas_defuncion, estimar_m
+
+@pytest.fixture
+def df():
+    anios = np.arange(2010, 2021)
+    P = np.linspace(1000.0, 2000.0, anios.size)
+    return pd.DataFrame({
+        'anio': anios,
+        'Poblacion_10ymas_P': P,
+        'T_obs': 0.1 * P,
+        'delta_t': np.full(anios.size, 0.006),
+        'delta_s_t': np.full(anios.size, 0.0001),
+    })
+
+def test_tasas_defuncion_rango_valido(df):
+    delta, delta_s, delta_n = estimar_tasas_defuncion(df, 2012, 2018)
+    assert delta == pytest.approx(0.006)
+    assert delta_s == pytest.approx(0.0001)
+    assert delta_n == pytest.approx(0.0059)
+
+@pytest.mark.parametrize("anio_ini, anio_fin", [(2018, 2012), (2030, 2040)])
+def test_tasas_defuncion_rango_vacio(df, anio_ini, anio_fin):
+    with pytest.raises(ValueError, match="No hay datos"):
+        estimar_tasas_defuncion(df, anio_ini, anio_fin)
+
+def test_m_rango_valido(df):
+    assert estimar_m(df, 2012, 2018) == pytest.approx(0.1)
+
+@pytest.mark.parametrize("anio_ini, anio_fin", [(2018, 2012), (2030, 2040)])
+def test_m_rango_vacio(df, anio_ini, anio_fin):
+    with pytest.raises(ValueError, match="No hay datos"):
+        estimar_m(df, anio_ini, anio_fin)
@@ -1,27 +1,50 @@
+import time
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QSpinBox, QMessageBox, QProgressBar, QPlainTextEdit)
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from .matplotlib_widget import MatplotlibWidget
 
-class CalibrationWorker(QThread):
+class CalibrationSignals(QObject):
+    """
+    Señales de CalibrationWorker (QRunnable no hereda de QObject).
+    """
     progress = pyqtSignal(int)
     finished = pyqtSignal(object, float, str)
     error = pyqtSignal(str)
 
-    def __init__(self, main_window, anio_ini, anio_fin, num_theta, num_gamma):
+class CalibrationWorker(QRunnable):
+    """
+    Tarea de calibración que se ejecuta en el QThreadPool global, que
+    reutiliza sus hilos entre calibraciones sucesivas.
+    """
+    def __init__(self, main_window, anio_ini, anio_fin, num_theta, num_gamma, n_starts=1):
         super().__init__()
+        # La vista conserva la referencia; el pool no debe destruir la tarea
+        self.setAutoDelete(False)
+        self.signals = CalibrationSignals()
         self.main_window = main_window
         self.anio_ini = anio_ini
         self.anio_fin = anio_fin
         self.num_theta = num_theta
         self.num_gamma = num_gamma
+        self.n_starts = n_starts
+        # Estado para agrupar avisos de progreso (ver run)
+        self._last_pct = -1
+        self._last_emit_ts = 0.0
 
     def run(self):
         try:
             from core.calibration import calibrar_parametros
             
             def cb(p):
-                self.progress.emit(p)
+                # Emitir solo si cambia el porcentaje y como máximo cada 50 ms,
+                # para no saturar el hilo de la interfaz con señales
+                pct = int(p)
+                now = time.monotonic()
+                if pct != self._last_pct and now - self._last_emit_ts > 0.05:
+                    self._last_pct = pct
+                    self._last_emit_ts = now
+                    self.signals.progress.emit(pct)
 
             params, cost, log = calibrar_parametros(
                 self.main_window.df,
@@ -30,11 +53,13 @@ class CalibrationWorker(QThread):
                 self.anio_fin,
                 self.num_theta,
                 self.num_gamma,
-                progress_callback=cb
+                progress_callback=cb,
+                n_starts=self.n_starts
             )
-            self.finished.emit(params, cost, log)
+            self.signals.progress.emit(100)
+            self.signals.finished.emit(params, cost, log)
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 class CalibrationView(QWidget):
     def __init__(self, main_window):
@@ -54,6 +79,10 @@ class CalibrationView(QWidget):
         self.spin_mesh.setRange(2, 50)
         self.spin_mesh.setValue(10)
         
+        self.spin_starts = QSpinBox()
+        self.spin_starts.setRange(1, 64)
+        self.spin_starts.setValue(1)
+        
         self.btn_calib = QPushButton("Iniciar Calibración")
         self.btn_calib.clicked.connect(self.start_calibration)
         
@@ -62,10 +91,17 @@ class CalibrationView(QWidget):
         controls_layout.addWidget(QLabel("Año Fin:"))
         controls_layout.addWidget(self.spin_end)
         lbl_mesh = QLabel("Malla (NxN):")
-        lbl_mesh.setToolTip("Este parámetro no se utiliza en el método de optimización actual (least_squares).")
-        self.spin_mesh.setToolTip("Este parámetro no se utiliza en el método de optimización actual (least_squares).")
+        tooltip_mesh = "Malla theta x gamma que se evalúa antes del ajuste por mínimos cuadrados para elegir el punto inicial."
+        lbl_mesh.setToolTip(tooltip_mesh)
+        self.spin_mesh.setToolTip(tooltip_mesh)
         controls_layout.addWidget(lbl_mesh)
         controls_layout.addWidget(self.spin_mesh)
+        lbl_starts = QLabel("Puntos iniciales:")
+        tooltip_starts = "Con más de un punto inicial, los ajustes se ejecutan en paralelo y se conserva el de menor costo."
+        lbl_starts.setToolTip(tooltip_starts)
+        self.spin_starts.setToolTip(tooltip_starts)
+        controls_layout.addWidget(lbl_starts)
+        controls_layout.addWidget(self.spin_starts)
         controls_layout.addWidget(self.btn_calib)
         controls_layout.addStretch()
         
@@ -77,6 +113,8 @@ class CalibrationView(QWidget):
         
         self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        # Acotar el registro: las líneas más antiguas se descartan
+        self.log_text.setMaximumBlockCount(5000)
         self.layout.addWidget(self.log_text)
         
     def set_years(self, min_y, max_y):
@@ -93,19 +131,23 @@ class CalibrationView(QWidget):
             self.spin_start.value(),
             self.spin_end.value(),
             self.spin_mesh.value(),
-            self.spin_mesh.value()
+            self.spin_mesh.value(),
+            self.spin_starts.value()
         )
-        self.worker.progress.connect(self.progress_bar.setValue)
-        self.worker.finished.connect(self.on_finished)
-        self.worker.error.connect(self.on_error)
-        self.worker.start()
+        self.worker.signals.progress.connect(self.progress_bar.setValue)
+        self.worker.signals.finished.connect(self.on_finished)
+        self.worker.signals.error.connect(self.on_error)
+        QThreadPool.globalInstance().start(self.worker)
 
     def on_finished(self, params, cost, log):
         self.btn_calib.setEnabled(True)
         self.progress_bar.setValue(100)
-        self.log_text.appendPlainText(log)
-        self.log_text.appendPlainText(f"\nCalibración finalizada.\nCosto final: {cost:.4f}")
-        self.log_text.appendPlainText(f"Parámetros calibrados:\nTheta: {params.theta}\nRho: {params.rho}\nBeta: {params.beta}\nGamma: {params.gamma}")
+        # Un solo append para el bloque final (una única relayout del documento)
+        self.log_text.appendPlainText(
+            f"{log}\n"
+            f"\nCalibración finalizada.\nCosto final: {cost:.4f}\n"
+            f"Parámetros calibrados:\nTheta: {params.theta}\nRho: {params.rho}\nBeta: {params.beta}\nGamma: {params.gamma}"
+        )
         
         # Actualizar modelo principal
         self.main_window.params = params
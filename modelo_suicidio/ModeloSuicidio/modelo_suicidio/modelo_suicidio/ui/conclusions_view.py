@@ -1,9 +1,58 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QTextEdit, QGroupBox, QFormLayout, QMessageBox, QFileDialog,
-                             QTableWidget, QTableWidgetItem, QHeaderView)
+                             QTableView, QHeaderView)
+from PyQt6.QtCore import QAbstractTableModel, Qt
+import numpy as np
 import pandas as pd
 from core.parameters import ModeloParametros
-from core.statistics import calculate_statistics, generar_texto_conclusion_detallada
+
+# Formateadores de celdas (métodos format ligados, creados una sola vez)
+_FMT_0 = "{:.0f}".format
+_FMT_1 = "{:.1f}".format
+_FMT_PCT_2 = "{:.2f}%".format
+
+# Caracteres internos del documento que toPlainText() convierte a texto plano
+# (saltos de línea manuales, separadores de párrafo y espacios no separables)
+_TEXTO_PLANO = str.maketrans({'\u2028': '\n', '\u2029': '\n', '\xa0': ' '})
+
+def _formatear(valores: np.ndarray, fmt) -> list[str]:
+    """
+    Convierte un arreglo en textos con el formateador dado; los valores no
+    finitos (NaN o infinitos) se muestran como '-'.
+    """
+    finitos = np.isfinite(valores).tolist()
+    return [fmt(v) if ok else "-" for v, ok in zip(valores.tolist(), finitos)]
+
+class TextosTableModel(QAbstractTableModel):
+    """
+    Modelo de solo lectura que muestra columnas de textos ya formateados.
+    """
+    def __init__(self, encabezados):
+        super().__init__()
+        self._encabezados = list(encabezados)
+        self._columnas = [[] for _ in self._encabezados]
+
+    def set_columnas(self, columnas):
+        self.beginResetModel()
+        self._columnas = columnas
+        self.endResetModel()
+
+    def rowCount(self, parent=None):
+        return len(self._columnas[0]) if self._columnas else 0
+
+    def columnCount(self, parent=None):
+        return len(self._encabezados)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid():
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self._columnas[index.column()][index.row()]
+        return None
+
+    def headerData(self, col, orientation, role):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self._encabezados[col]
+        return None
 
 class ConclusionsView(QWidget):
     def __init__(self, main_window):
@@ -34,9 +83,9 @@ class ConclusionsView(QWidget):
         table_group = QGroupBox("Tabla Comparativa: Observados vs Simulados")
         table_layout = QVBoxLayout()
         
-        self.table_comparison = QTableWidget()
-        self.table_comparison.setColumnCount(5)
-        self.table_comparison.setHorizontalHeaderLabels(["Año", "T_obs", "T_model", "Error Abs", "Error Rel (%)"])
+        self.table_comparison = QTableView()
+        self.table_model = TextosTableModel(["Año", "T_obs", "T_model", "Error Abs", "Error Rel (%)"])
+        self.table_comparison.setModel(self.table_model)
         self.table_comparison.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         table_layout.addWidget(self.table_comparison)
         
@@ -75,16 +124,21 @@ class ConclusionsView(QWidget):
             
         # Usar el rango de años definido en la pestaña de simulación o calibración
         # Por defecto usaremos todo el rango de datos disponible
-        anio_ini = int(self.main_window.df['anio'].min())
-        anio_fin = int(self.main_window.df['anio'].max())
+        # (calculado una vez al cargar los datos)
+        anio_ini, anio_fin = self.main_window.anios_datos
         
         try:
+            # Import diferido (core.statistics carga scipy.integrate a través de core.analysis)
+            from core.statistics import calculate_statistics
+            
             # Primero calculamos estadísticas para obtener el res_df actualizado
-            stats = calculate_statistics(self.main_window.df, self.main_window.params, anio_ini, anio_fin)
+            # (calculate_statistics reutiliza el resultado si nada cambió)
+            params = self.main_window.params
+            stats = calculate_statistics(self.main_window.df, params, anio_ini, anio_fin)
             res_df = stats.get('res_df', None)
             
             if res_df is not None:
-                self.actualizar_desde_resultados(res_df, self.main_window.params, anio_ini, anio_fin)
+                self.actualizar_desde_resultados(res_df, params, anio_ini, anio_fin, stats=stats)
             else:
                 QMessageBox.warning(self, "Error", "No se pudieron generar los datos simulados.")
             
@@ -97,66 +151,53 @@ class ConclusionsView(QWidget):
         anio, T_obs, T_model, error_abs, error_rel (%).
         """
         if df_resultados is None or df_resultados.empty:
-            self.table_comparison.setRowCount(0)
+            self.table_model.set_columnas([[] for _ in range(self.table_model.columnCount())])
             return
 
         # Filtrar filas donde existan tanto T_obs como T_model (o al menos T_model para mostrar)
         # Para la comparativa, idealmente necesitamos ambos, pero mostraremos lo que haya.
         # Asumimos que df_resultados tiene 'anio', 'T_obs', 'T_model'
         
-        # Crear copia para no modificar el original
-        df = df_resultados.copy()
+        # Extraer columnas como arreglos (sin copiar el DataFrame)
+        anio = df_resultados['anio'].to_numpy(dtype=np.int64)
+        obs = df_resultados['T_obs'].to_numpy(dtype=float)
+        mdl = df_resultados['T_model'].to_numpy(dtype=float)
         
         # Calcular errores si no existen
-        if 'error' not in df.columns:
-            df['error'] = df['T_model'] - df['T_obs']
-        if 'error_rel' not in df.columns:
-            df['error_rel'] = (df['error'] / df['T_obs']).abs() * 100
-            
-        # Seleccionar columnas de interés
-        cols = ['anio', 'T_obs', 'T_model', 'error', 'error_rel']
-        
-        # Limpiar tabla
-        self.table_comparison.setRowCount(0)
-        
-        # Llenar tabla
-        for _, row in df.iterrows():
-            row_idx = self.table_comparison.rowCount()
-            self.table_comparison.insertRow(row_idx)
-            
-            # Año
-            self.table_comparison.setItem(row_idx, 0, QTableWidgetItem(str(int(row['anio']))))
-            
-            # T_obs
-            val_obs = row['T_obs']
-            str_obs = f"{val_obs:.1f}" if pd.notnull(val_obs) else "-"
-            self.table_comparison.setItem(row_idx, 1, QTableWidgetItem(str_obs))
-            
-            # T_model
-            val_model = row['T_model']
-            str_model = f"{val_model:.0f}" if pd.notnull(val_model) else "-"
-            self.table_comparison.setItem(row_idx, 2, QTableWidgetItem(str_model))
-            
-            # Error Abs
-            val_err = abs(row['error'])
-            str_err = f"{val_err:.1f}" if pd.notnull(val_err) else "-"
-            self.table_comparison.setItem(row_idx, 3, QTableWidgetItem(str_err))
-            
-            # Error Rel
-            val_rel = row['error_rel']
-            str_rel = f"{val_rel:.2f}%" if pd.notnull(val_rel) else "-"
-            self.table_comparison.setItem(row_idx, 4, QTableWidgetItem(str_rel))
+        if 'error' in df_resultados.columns:
+            err = df_resultados['error'].to_numpy(dtype=float)
+        else:
+            err = mdl - obs
+        if 'error_rel' in df_resultados.columns:
+            rel = df_resultados['error_rel'].to_numpy(dtype=float)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rel = np.abs(err / obs) * 100
+        
+        # Preformatear todas las celdas antes de tocar la tabla
+        columnas = [
+            np.char.mod('%d', anio).tolist(),
+            _formatear(obs, _FMT_1),
+            _formatear(mdl, _FMT_0),
+            _formatear(np.abs(err), _FMT_1),
+            _formatear(rel, _FMT_PCT_2),
+        ]
+        
+        # Un solo reinicio del modelo, sin crear un objeto por celda
+        self.table_model.set_columnas(columnas)
 
     def actualizar_desde_resultados(
         self,
         df_resultados: pd.DataFrame,
         params_actuales: ModeloParametros,
         anio_ini: int,
-        anio_fin: int
+        anio_fin: int,
+        stats: dict | None = None
     ) -> None:
         """
         - Actualiza la tabla comparativa con df_resultados.
-        - Recalcula las estadísticas de ajuste.
+        - Calcula las estadísticas de ajuste a partir de df_resultados
+          (o usa stats si ya se calcularon), sin volver a simular.
         - Genera el texto de conclusiones generales.
         - Genera el párrafo específico sobre la tabla comparativa.
         - Muestra todo en la pestaña Conclusiones.
@@ -165,16 +206,12 @@ class ConclusionsView(QWidget):
         self.actualizar_tabla_comparativa(df_resultados)
         
         # 2. Calcular estadísticas
-        # Nota: calculate_statistics recalcula la simulación internamente si se le pasa solo df y params.
-        # Pero aquí ya tenemos df_resultados (que se supone es el resultado de la simulación).
-        # Sin embargo, calculate_statistics está diseñado para recibir el df de entrada (observados) y params.
-        # Para evitar doble cálculo, podríamos refactorizar calculate_statistics, pero por ahora lo usaremos como está
-        # asumiendo que es rápido o que df_resultados es consistente.
-        # O mejor, usamos calculate_statistics para obtener las métricas y le pasamos el df_resultados si fuera posible.
-        # Dado que calculate_statistics llama a prueba_escritorio, y eso es rápido, lo llamamos normal.
-        
+        # df_resultados ya es la simulación con params_actuales: basta con medir el ajuste
         try:
-            stats = calculate_statistics(self.main_window.df, params_actuales, anio_ini, anio_fin)
+            from core.statistics import calcular_estadisticas, generar_texto_conclusion_detallada
+            
+            if stats is None:
+                stats = calcular_estadisticas(df_resultados)
             
             self.lbl_r2.setText(f"{stats['R2']:.4f}")
             self.lbl_mse.setText(f"{stats['MSE']:.4f}")
@@ -183,7 +220,6 @@ class ConclusionsView(QWidget):
             self.lbl_mape.setText(f"{stats['MAPE']:.2f}%")
             
             # 3. Generar texto
-            # Usamos el res_df que devuelve stats, que debería ser igual a df_resultados si los params son los mismos
             res_df = stats.get('res_df', df_resultados)
             
             text = generar_texto_conclusion_detallada(stats, params_actuales, res_df, anio_ini, anio_fin)
@@ -193,16 +229,22 @@ class ConclusionsView(QWidget):
             QMessageBox.critical(self, "Error", f"Error al actualizar conclusiones: {e}")
             
     def export_report(self):
-        text = self.text_conclusions.toPlainText()
-        if not text:
+        documento = self.text_conclusions.document()
+        if documento.isEmpty():
             QMessageBox.warning(self, "Aviso", "No hay conclusiones para exportar.")
             return
             
         filename, _ = QFileDialog.getSaveFileName(self, "Guardar Informe", "Informe_Conclusiones.txt", "Text Files (*.txt)")
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(text)
+                # Escribir bloque a bloque desde el documento, sin materializar todo el texto
+                with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                    block = documento.begin()
+                    while block.isValid():
+                        f.write(block.text().translate(_TEXTO_PLANO))
+                        block = block.next()
+                        if block.isValid():
+                            f.write('\n')
                 QMessageBox.information(self, "Éxito", f"Informe guardado en {filename}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"No se pudo guardar el archivo: {e}")
@@ -1,29 +1,73 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QFileDialog, QTableView, QLabel, QHeaderView, QMessageBox)
-from PyQt6.QtCore import QAbstractTableModel, Qt
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from collections import OrderedDict
 import pandas as pd
 from .matplotlib_widget import MatplotlibWidget
 
+# Filas por ventana de textos y número de ventanas que se conservan
+FILAS_VENTANA = 500
+MAX_VENTANAS = 8
+
+def _textos_columna(serie: pd.Series) -> list[str]:
+    """
+    Textos de una columna: las numéricas se convierten en bloque con NumPy
+    (mismo resultado que str() por celda); las demás celda por celda.
+    """
+    if serie.dtype.kind in 'iuf':
+        return serie.to_numpy().astype(str).tolist()
+    return [str(v) for v in serie.tolist()]
+
 class PandasModel(QAbstractTableModel):
     def __init__(self, data):
         super().__init__()
         self._data = data
+        self._cols = list(data.columns)
+        # Textos por ventanas de filas (LRU): solo se formatea lo que se muestra
+        self._ventanas = OrderedDict()
+        # Filas expuestas a la vista; el resto se entrega con fetchMore
+        self._filas_cargadas = min(FILAS_VENTANA, data.shape[0])
+
+    def _ventana(self, id_ventana):
+        textos = self._ventanas.get(id_ventana)
+        if textos is None:
+            ini = id_ventana * FILAS_VENTANA
+            bloque = self._data.iloc[ini:ini + FILAS_VENTANA]
+            textos = [_textos_columna(bloque[col]) for col in bloque.columns]
+            self._ventanas[id_ventana] = textos
+            if len(self._ventanas) > MAX_VENTANAS:
+                self._ventanas.popitem(last=False)
+        else:
+            self._ventanas.move_to_end(id_ventana)
+        return textos
 
     def rowCount(self, parent=None):
-        return self._data.shape[0]
+        return self._filas_cargadas
 
     def columnCount(self, parent=None):
-        return self._data.shape[1]
+        return len(self._cols)
+
+    def canFetchMore(self, parent):
+        return self._filas_cargadas < self._data.shape[0]
+
+    def fetchMore(self, parent):
+        nuevas = min(FILAS_VENTANA, self._data.shape[0] - self._filas_cargadas)
+        if nuevas <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._filas_cargadas, self._filas_cargadas + nuevas - 1)
+        self._filas_cargadas += nuevas
+        self.endInsertRows()
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if index.isValid():
             if role == Qt.ItemDataRole.DisplayRole:
-                return str(self._data.iloc[index.row(), index.column()])
+                fila = index.row()
+                return self._ventana(fila // FILAS_VENTANA)[index.column()][fila % FILAS_VENTANA]
         return None
 
     def headerData(self, col, orientation, role):
         if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
-            return self._data.columns[col]
+            return self._cols[col]
         return None
 
 class DataView(QWidget):
@@ -46,12 +90,17 @@ class DataView(QWidget):
         
         # Tabla
         self.table_view = QTableView()
+        self.table_view.setVerticalScrollMode(QTableView.ScrollMode.ScrollPerPixel)
         self.layout.addWidget(self.table_view)
         
         # Gráficos
         self.plot_widget = MatplotlibWidget()
         self.layout.addWidget(self.plot_widget)
         
+        # Líneas de P(t) y T_obs(t), reutilizadas entre actualizaciones
+        self._ln_P = None
+        self._ln_T = None
+        
     def load_excel(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Abrir Excel", "", "Excel Files (*.xlsx *.xls)")
         if file_name:
@@ -74,23 +123,30 @@ class DataView(QWidget):
             max_year = df['anio'].max()
             self.lbl_info.setText(f"Datos cargados: {min_year} - {max_year} ({len(df)} registros)")
             
-            # Actualizar gráficos
-            fig = self.plot_widget.get_figure()
-            fig.clear()
-            
-            ax1 = fig.add_subplot(121)
-            ax1.plot(df['anio'], df['Poblacion_10ymas_P'], 'b-o')
-            ax1.set_title("Población Vulnerable P(t)")
-            ax1.set_xlabel("Año")
-            ax1.grid(True)
-            
-            ax2 = fig.add_subplot(122)
-            ax2.plot(df['anio'], df['T_obs'], 'r-o')
-            ax2.set_title("Tratamiento Observado T_obs(t)")
-            ax2.set_xlabel("Año")
-            ax2.grid(True)
+            # Actualizar gráficos: los ejes se crean una vez y después solo
+            # se reemplazan los datos de las líneas
+            if self._ln_P is None:
+                fig = self.plot_widget.get_figure()
+                fig.clear()
+                
+                ax1 = fig.add_subplot(121)
+                self._ln_P, = ax1.plot(df['anio'], df['Poblacion_10ymas_P'], 'b-o')
+                ax1.set_title("Población Vulnerable P(t)")
+                ax1.set_xlabel("Año")
+                ax1.grid(True)
+                
+                ax2 = fig.add_subplot(122)
+                self._ln_T, = ax2.plot(df['anio'], df['T_obs'], 'r-o')
+                ax2.set_title("Tratamiento Observado T_obs(t)")
+                ax2.set_xlabel("Año")
+                ax2.grid(True)
+            else:
+                self._ln_P.set_data(df['anio'], df['Poblacion_10ymas_P'])
+                self._ln_T.set_data(df['anio'], df['T_obs'])
+                for ln in (self._ln_P, self._ln_T):
+                    self.plot_widget.reescalar(ln.axes)
             
-            self.plot_widget.draw()
+            self.plot_widget.draw_idle()
             
             # Agregar descripción
             desc = "<b>Gráfica de Población Vulnerable P(t):</b><br>"
@@ -1,8 +1,8 @@
+from dataclasses import replace
 from PyQt6.QtWidgets import QMainWindow, QTabWidget, QVBoxLayout, QWidget
 from core.data_loader import cargar_datos_excel
 from core.parameters import ModeloParametros
 from core.linear_relations import estimar_tasas_defuncion, estimar_m, calcular_phi_psi, construir_series_lineales
-from core.analysis import prueba_escritorio
 
 from .data_view import DataView
 from .parameters_view import ParametersView
@@ -39,13 +39,17 @@ class MainWindow(QMainWindow):
         # Estado del modelo
         self.df = None
         self.params = None
+        # (año mínimo, año máximo) de los datos cargados
+        self.anios_datos = None
 
     def load_data(self, path):
         self.df = cargar_datos_excel(path)
         
         # Configurar rangos por defecto en las vistas
-        min_y = int(self.df['anio'].min())
-        max_y = int(self.df['anio'].max())
+        anios = self.df['anio'].to_numpy()
+        min_y = int(anios.min())
+        max_y = int(anios.max())
+        self.anios_datos = (min_y, max_y)
         
         self.ui_parameters.set_years(min_y, max_y)
         self.ui_simulation.set_years(min_y, max_y)
@@ -95,13 +99,13 @@ class MainWindow(QMainWindow):
     def update_nonlinear_params_from_ui(self):
         if self.params:
             ui_vals = self.ui_parameters.get_nonlinear_params()
-            self.params.theta = ui_vals['theta']
-            self.params.rho = ui_vals['rho']
-            self.params.beta = ui_vals['beta']
-            self.params.gamma = ui_vals['gamma']
+            self.params = replace(self.params, **ui_vals)
 
     def run_simulation(self, anio_ini, anio_fin):
         if self.df is None or self.params is None:
             raise ValueError("Faltan datos o parámetros.")
-            
+        
+        # Import diferido: core.analysis carga scipy.integrate, que solo se
+        # necesita a partir de la primera simulación
+        from core.analysis import prueba_escritorio
         return prueba_escritorio(self.df, self.params, anio_ini, anio_fin)
@@ -3,6 +3,18 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 
+# Traducción de las acciones de la barra de herramientas: texto -> (texto, tooltip)
+_TRADUCCIONES_BARRA = {
+    'Home': ('Inicio', 'Restablecer vista original'),
+    'Back': ('Atrás', 'Vista anterior'),
+    'Forward': ('Adelante', 'Vista siguiente'),
+    'Pan': ('Mover', 'Mover el gráfico'),
+    'Zoom': ('Zoom', 'Acercar/Alejar'),
+    'Subplots': ('Subtramas', 'Configurar subtramas'),
+    'Customize': ('Personalizar', 'Editar parámetros del gráfico'),
+    'Save': ('Guardar', 'Guardar la figura'),
+}
+
 class MatplotlibWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -14,30 +26,11 @@ class MatplotlibWidget(QWidget):
         
         # Traducir acciones de la barra de herramientas
         for action in self.toolbar.actions():
-            if action.text() == 'Home':
-                action.setText('Inicio')
-                action.setToolTip('Restablecer vista original')
-            elif action.text() == 'Back':
-                action.setText('Atrás')
-                action.setToolTip('Vista anterior')
-            elif action.text() == 'Forward':
-                action.setText('Adelante')
-                action.setToolTip('Vista siguiente')
-            elif action.text() == 'Pan':
-                action.setText('Mover')
-                action.setToolTip('Mover el gráfico')
-            elif action.text() == 'Zoom':
-                action.setText('Zoom')
-                action.setToolTip('Acercar/Alejar')
-            elif action.text() == 'Subplots':
-                action.setText('Subtramas')
-                action.setToolTip('Configurar subtramas')
-            elif action.text() == 'Customize':
-                action.setText('Personalizar')
-                action.setToolTip('Editar parámetros del gráfico')
-            elif action.text() == 'Save':
-                action.setText('Guardar')
-                action.setToolTip('Guardar la figura')
+            traduccion = _TRADUCCIONES_BARRA.get(action.text())
+            if traduccion is not None:
+                texto, tooltip = traduccion
+                action.setText(texto)
+                action.setToolTip(tooltip)
         
         self.layout.addWidget(self.toolbar)
         self.layout.addWidget(self.canvas)
@@ -59,6 +52,21 @@ class MatplotlibWidget(QWidget):
     def draw(self):
         self.canvas.draw()
         
+    def draw_idle(self):
+        # Agenda el redibujado para el siguiente ciclo de eventos de Qt
+        self.canvas.draw_idle()
+        
+    def reescalar(self, ax):
+        """
+        Ajusta los límites de ax a los datos actuales de sus artistas (tras
+        set_data) y reinicia el historial de vistas de la barra de herramientas.
+        """
+        ax.relim()
+        # Un zoom o desplazamiento previo desactiva el autoescalado
+        ax.set_autoscale_on(True)
+        ax.autoscale_view()
+        self.toolbar.update()
+        
     def set_description(self, text):
         if text:
             self.lbl_description.setText(text)
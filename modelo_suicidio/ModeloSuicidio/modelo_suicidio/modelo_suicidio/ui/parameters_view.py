@@ -1,5 +1,7 @@
+from dataclasses import replace
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QDoubleSpinBox, QGroupBox, QFormLayout, QSpinBox, QMessageBox)
+from PyQt6.QtCore import QTimer
 from .matplotlib_widget import MatplotlibWidget
 
 class ParametersView(QWidget):
@@ -42,7 +44,12 @@ class ParametersView(QWidget):
         self.spin_phi.setRange(0.0, 1.0)
         self.spin_phi.setSingleStep(0.01)
         self.spin_phi.setValue(0.5)
-        self.spin_phi.valueChanged.connect(self.update_psi)
+        # Agrupar las señales seguidas (p. ej. al teclear) en una sola actualización
+        self._timer_psi = QTimer(self)
+        self._timer_psi.setSingleShot(True)
+        self._timer_psi.setInterval(50)
+        self._timer_psi.timeout.connect(self.update_psi)
+        self.spin_phi.valueChanged.connect(lambda _valor: self._timer_psi.start())
         
         self.lbl_psi = QLabel("0.0")
         
@@ -102,6 +109,9 @@ class ParametersView(QWidget):
         # Gráfico
         self.plot_widget = MatplotlibWidget()
         self.layout.addWidget(self.plot_widget)
+        
+        # Líneas S_lin, T_lin y R_lin, reutilizadas entre actualizaciones
+        self._lineas_lin = None
 
     def set_years(self, min_y, max_y):
         self.spin_year_start.setValue(min_y)
@@ -120,10 +130,12 @@ class ParametersView(QWidget):
     def update_psi(self):
         # Recalcular psi si cambia phi
         if self.main_window.params:
-            self.main_window.params.phi = self.spin_phi.value()
+            phi = self.spin_phi.value()
+            if phi == self.main_window.params.phi:
+                return # Sin cambios
             # psi = 1 - m - phi*m
             m = self.main_window.params.m
-            self.main_window.params.psi = 1.0 - m - self.main_window.params.phi * m
+            self.main_window.params = replace(self.main_window.params, phi=phi, psi=1.0 - m - phi * m)
             self.lbl_psi.setText(f"{self.main_window.params.psi:.4f}")
 
     def update_display_params(self):
@@ -161,19 +173,25 @@ class ParametersView(QWidget):
     def plot_linear_series(self):
         df = self.main_window.df
         if df is not None and 'S_lin' in df.columns:
-            fig = self.plot_widget.get_figure()
-            fig.clear()
-            ax = fig.add_subplot(111)
-            
-            ax.plot(df['anio'], df['S_lin'], label='S_lin')
-            ax.plot(df['anio'], df['T_lin'], label='T_lin')
-            ax.plot(df['anio'], df['R_lin'], label='R_lin')
-            ax.set_title("Series Lineales Aproximadas")
-            ax.set_xlabel("Año")
-            ax.legend()
-            ax.grid(True)
+            columnas = ('S_lin', 'T_lin', 'R_lin')
+            if self._lineas_lin is None:
+                fig = self.plot_widget.get_figure()
+                fig.clear()
+                ax = fig.add_subplot(111)
+                
+                self._lineas_lin = [ax.plot(df['anio'], df[col], label=col)[0] for col in columnas]
+                ax.set_title("Series Lineales Aproximadas")
+                ax.set_xlabel("Año")
+                # Posición fija (la que elegía 'best'): evita buscar el hueco en cada dibujo
+                ax.legend(loc='center right')
+                ax.grid(True)
+            else:
+                # Solo cambian los datos: se conservan ejes, leyenda y rejilla
+                for ln, col in zip(self._lineas_lin, columnas):
+                    ln.set_data(df['anio'], df[col])
+                self.plot_widget.reescalar(self._lineas_lin[0].axes)
             
-            self.plot_widget.draw()
+            self.plot_widget.draw_idle()
             
             # Agregar descripción
             desc = "<b>Series Lineales Aproximadas:</b><br>"
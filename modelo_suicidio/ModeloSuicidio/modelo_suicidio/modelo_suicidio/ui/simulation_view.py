@@ -2,6 +2,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QSpinBox, QMessageBox, QCheckBox)
 from .matplotlib_widget import MatplotlibWidget
 import numpy as np
+from core.data_loader import rango_anios
 
 class SimulationView(QWidget):
     def __init__(self, main_window):
@@ -29,8 +30,6 @@ class SimulationView(QWidget):
         
         self.layout.addLayout(controls_layout)
         
-        self.layout.addLayout(controls_layout)
-        
         # Gráfico 1: Dinámica Poblacional
         self.plot_dynamics = MatplotlibWidget()
         self.layout.addWidget(self.plot_dynamics)
@@ -38,6 +37,13 @@ class SimulationView(QWidget):
         # Gráfico 2: Ajuste T(t)
         self.plot_fit = MatplotlibWidget()
         self.layout.addWidget(self.plot_fit)
+        
+        # Ejes y líneas persistentes: se crean en el primer dibujo y después
+        # solo se actualizan sus datos
+        self._ax1 = None
+        self._lineas1 = None
+        self._ax2 = None
+        self._lineas2 = None
 
     def set_years(self, min_y, max_y):
         self.spin_start.setValue(min_y)
@@ -66,47 +72,87 @@ class SimulationView(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
 
-    def plot_results(self, res_df):
+    def _crear_graficas(self):
+        """
+        Crea una sola vez los ejes, líneas (aún vacías), títulos, leyendas y
+        descripciones de ambas gráficas.
+        """
         # --- Gráfico 1: Dinámica Poblacional ---
         fig1 = self.plot_dynamics.get_figure()
         fig1.clear()
         
         ax1 = fig1.add_subplot(111)
-        ax1.plot(res_df['anio'], res_df['S_model'], label='S(t)', color='blue')
-        ax1.plot(res_df['anio'], res_df['T_model'], label='T(t)', color='orange')
-        ax1.plot(res_df['anio'], res_df['R_model'], label='R(t)', color='green')
+        # Las tres curvas en una sola llamada; los colores se asignan después
+        lineas = ax1.plot(np.empty(0), np.empty((0, 3)), label=['S(t)', 'T(t)', 'R(t)'])
+        for linea, color in zip(lineas, ('blue', 'orange', 'green')):
+            linea.set_color(color)
         
         # P(t) también para referencia
-        if self.main_window.df is not None:
-             mask = (self.main_window.df['anio'] >= res_df['anio'].min()) & \
-                    (self.main_window.df['anio'] <= res_df['anio'].max())
-             sub = self.main_window.df[mask]
-             ax1.plot(sub['anio'], sub['Poblacion_10ymas_P'], 'k--', label='P(t) data', alpha=0.5)
+        linea_P, = ax1.plot([], [], 'k--', label='P(t) data', alpha=0.5)
 
         ax1.set_title("Dinámica Poblacional (Modelo No Lineal)")
-        ax1.legend()
+        # Posición fija (la que elegía 'best'): evita buscar el hueco en cada dibujo
+        ax1.legend(loc='upper left')
         ax1.grid(True)
         
         desc1 = "Esta gráfica muestra la evolución de los compartimentos S(t), T(t) y R(t) a lo largo del tiempo. La línea azul representa la población susceptible, la línea naranja muestra la población en tratamiento, y la línea verde muestra a los recuperados. Los datos de la población vulnerable (P(t)) se muestran en la línea gris punteada."
         self.plot_dynamics.set_description(desc1)
-        self.plot_dynamics.draw()
         
         # --- Gráfico 2: Ajuste T(t) ---
         fig2 = self.plot_fit.get_figure()
         fig2.clear()
         
         ax2 = fig2.add_subplot(111)
-        ax2.plot(res_df['anio'], res_df['T_model'], 'b-', label='T Modelo')
-        
-        if 'T_obs' in res_df.columns:
-            valid = res_df.dropna(subset=['T_obs'])
-            ax2.plot(valid['anio'], valid['T_obs'], 'ro', label='T Observado')
+        linea_modelo, = ax2.plot([], [], 'b-', label='T Modelo')
+        linea_obs, = ax2.plot([], [], 'ro', label='T Observado')
             
         ax2.set_title("Ajuste T(t)")
         ax2.set_xlabel("Año")
-        ax2.legend()
+        ax2.legend(loc='upper left')
         ax2.grid(True)
         
         desc2 = "En esta gráfica, se compara el modelo T(t) (línea azul) con los datos observados T_obs (puntos rojos). La comparación muestra cómo el modelo simula la dinámica de los casos en tratamiento en comparación con los datos reales."
         self.plot_fit.set_description(desc2)
-        self.plot_fit.draw()
+        
+        self._ax1, self._lineas1 = ax1, (*lineas, linea_P)
+        self._ax2, self._lineas2 = ax2, (linea_modelo, linea_obs)
+
+    def plot_results(self, res_df):
+        if self._ax1 is None:
+            self._crear_graficas()
+        
+        # Años y T(t) extraídos una sola vez como arreglos (sin Series intermedias)
+        anio = res_df['anio'].to_numpy()
+        T_model = res_df['T_model'].to_numpy()
+        
+        # --- Gráfico 1: Dinámica Poblacional ---
+        linea_S, linea_T, linea_R, linea_P = self._lineas1
+        linea_S.set_data(anio, res_df['S_model'].to_numpy())
+        linea_T.set_data(anio, T_model)
+        linea_R.set_data(anio, res_df['R_model'].to_numpy())
+        
+        # (slice por búsqueda binaria sobre los años ordenados, sin máscara ni copia)
+        df = self.main_window.df
+        if df is not None:
+            rango = rango_anios(df, anio.min(), anio.max())
+            linea_P.set_data(df['anio'].to_numpy()[rango], df['Poblacion_10ymas_P'].to_numpy()[rango])
+        else:
+            linea_P.set_data([], [])
+        
+        self.plot_dynamics.reescalar(self._ax1)
+        self.plot_dynamics.draw_idle()
+        
+        # --- Gráfico 2: Ajuste T(t) ---
+        linea_modelo, linea_obs = self._lineas2
+        linea_modelo.set_data(anio, T_model)
+        
+        if 'T_obs' in res_df.columns:
+            # Máscara sobre el arreglo en lugar de dropna (que copia el DataFrame)
+            T_obs = res_df['T_obs'].to_numpy(dtype=float)
+            validos = ~np.isnan(T_obs)
+            linea_obs.set_data(anio[validos], T_obs[validos])
+        else:
+            linea_obs.set_data([], [])
+        
+        self.plot_fit.reescalar(self._ax2)
+        self.plot_fit.draw_idle()
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from core.data_loader import cargar_datos_excel
 from core.parameters import ModeloParametros
 from core.linear_relations import estimar_tasas_defuncion, estimar_m, calcular_phi_psi
 from core.calibration import calibrar_parametros
@@ -7,7 +8,7 @@ from core.analysis import prueba_escritorio
 
 def verify():
     print("Cargando datos...")
-    df = pd.read_excel('Simulacion.xlsx', sheet_name='Datos')
+    df = cargar_datos_excel('Simulacion.xlsx')
     
     anio_ini = 2010
     anio_fin = 2020
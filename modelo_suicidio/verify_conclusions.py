@@ -7,17 +7,15 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from modelo_suicidio.core.parameters import ModeloParametros
-from modelo_suicidio.core.statistics import calculate_statistics, generar_texto_conclusion_detallada
+from modelo_suicidio.core.statistics import calculate_statistics, generar_texto_conclusion_detallada_iter
 
 def test_conclusions():
     print("Testing conclusions generation...")
     
-    # Create dummy data
-    data = {
-        'anio': range(2010, 2020),
-        'T_obs': [100, 110, 120, 130, 140, 150, 160, 170, 180, 190]
-    }
-    df = pd.DataFrame(data)
+    # Create dummy data from typed arrays
+    anio = np.arange(2010, 2020, dtype=np.int32)
+    T_obs = np.arange(100, 200, 10, dtype=np.float64)
+    df = pd.DataFrame({'anio': anio, 'T_obs': T_obs})
     
     # Define parameters
     params = ModeloParametros(
@@ -41,9 +39,8 @@ def test_conclusions():
     # For this test, let's manually create the result DF that calculate_statistics would produce
     # and then call generar_texto_conclusion_detallada directly.
     
-    res_df = df.copy()
     # Simulate a model that slightly overestimates
-    res_df['T_model'] = res_df['T_obs'] * 1.05 
+    res_df = df.assign(T_model=T_obs * 1.05)
     
     stats = {
         'R2': 0.95,
@@ -55,12 +52,10 @@ def test_conclusions():
         'res_df': res_df
     }
     
-    text = generar_texto_conclusion_detallada(stats, params, res_df, 2010, 2019)
-    
-    # Write to file to avoid console encoding issues
+    # Write to file to avoid console encoding issues, streaming the report section by section
     output_file = "conclusions_output.txt"
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(text)
+    with open(output_file, "w", encoding="utf-8", buffering=1 << 16) as f:
+        f.writelines(generar_texto_conclusion_detallada_iter(stats, params, res_df, 2010, 2019))
         
     print(f"\nGenerated Text written to {output_file}")
     print("\nTest finished.")